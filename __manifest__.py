@@ -2,23 +2,30 @@
 {
     "name": "Digital Signage",
     "summary": "Playlists of images, videos, webpages, and QWeb templates for screens",
-    "version": "18.0.1.3.2",
+    "version": "18.0.1.4.0",
     "category": "Marketing",
     "author": "Independent Solutions",
     "website": "https://isolpa.com",
     "license": "LGPL-3",
-    "depends": ["base", "web", "calendar"],
+    "depends": ["base", "web", "bus", "calendar"],
     "data": [
         "security/security.xml",
         "security/ir.model.access.csv",
         "views/menu.xml",
         "views/asset_views.xml",
+        "views/asset_duplicate_views.xml",
         "views/playlist_views.xml",
         "views/screen_views.xml",
         "views/player_templates.xml",
+        "views/play_stat_views.xml",
+        "views/screen_health_views.xml",
+        "views/telemetry_views.xml",
+        "wizard/screen_provision_views.xml",
+        "data/ir_cron.xml",
     ],
     "assets": {
-        "web.assets_frontend": [
+        # Loaded by the standalone player page only, never by the website
+        "ds_signage.assets_player": [
             "ds_signage/static/src/css/player.css",
             "ds_signage/static/src/js/player.js",
         ],
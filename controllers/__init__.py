@@ -1,2 +1,4 @@
 # -*- coding: utf-8 -*-
 from . import main
+from . import fleet
+from . import upload
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from odoo import _, http
+from odoo.exceptions import UserError
+from odoo.http import request
+
+# Fields accepted for each screen created through the API
+_CREATE_FIELDS = {'name', 'playlist_id', 'preloader_asset_id', 'tz', 'note', 'is_public'}
+
+
+class DsFleetController(http.Controller):
+    """JSON-RPC batch operations on screens, for provisioning tools.
+
+    Every call runs as the authenticated user (access rights apply), touches
+    any number of screens with a fixed number of queries and answers with
+    the ``id``, ``name``, ``token`` and player ``url`` of the screens.
+    """
+
+    @http.route(['/ds/api/screens/create'], type='json', auth='user', methods=['POST'])
+    def screens_create(self, screens):
+        """Create screens from a list of ``{name, playlist_id, preloader_asset_id, tz, note, is_public}``"""
+        vals_list = []
+        for vals in screens:
+            if not vals.get('name'):
+                raise UserError(_("Every screen needs a name."))
+            vals_list.append({k: v for k, v in vals.items() if k in _CREATE_FIELDS})
+        return request.env['ds.screen'].create(vals_list)._get_provisioning_data()
+
+    @http.route(['/ds/api/screens/assign'], type='json', auth='user', methods=['POST'])
+    def screens_assign(self, screen_ids, **vals):
+        """Set ``playlist_id`` and/or ``preloader_asset_id`` (false clears it) on all ``screen_ids``"""
+        screens = request.env['ds.screen'].browse(screen_ids).exists()
+        screens._bulk_assign(vals)
+        return screens._get_provisioning_data()
+
+    @http.route(['/ds/api/screens/regenerate_tokens'], type='json', auth='user', methods=['POST'])
+    def screens_regenerate_tokens(self, screen_ids):
+        screens = request.env['ds.screen'].browse(screen_ids).exists()
+        screens._regenerate_tokens()
+        return screens._get_provisioning_data()
+
+    @http.route(['/ds/api/screens/urls'], type='json', auth='user', methods=['POST'])
+    def screens_urls(self, screen_ids):
+        return request.env['ds.screen'].browse(screen_ids).exists()._get_provisioning_data()
@@ -1,11 +1,21 @@
 # -*- coding: utf-8 -*-
-import base64
+import hashlib
+import hmac
 import json
 import logging
-from urllib.parse import parse_qs, urlparse
+import re
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlencode, urlparse
 
 from odoo import http, fields
-from odoo.http import request
+from odoo.http import Stream, request
+from odoo.tools import file_open
+
+from odoo.addons.bus.websocket import WebsocketConnectionHandler
+from odoo.addons.ds_signage.models.metrics import instrument, metrics
+from odoo.addons.ds_signage.models.payload_cache import calendar_cache, payload_cache, render_cache, schedule_cache
+from odoo.addons.ds_signage.models.screen import heartbeats
 
 _logger = logging.getLogger(__name__)
 
@@ -32,161 +42,519 @@ def _youtube_embed_from_url(url):
         return url
 
 
+# Seconds between two proof-of-play uploads of a player
+EVENTS_FLUSH_INTERVAL = 30
+# Largest proof-of-play upload accepted, in bytes
+EVENTS_MAX_BODY = 1024 * 1024
+# Seconds between two performance summaries of a player
+TELEMETRY_INTERVAL = 5 * 60
+# How far ahead (seconds) a player may fetch the manifest of its next schedule transition
+MANIFEST_MAX_LOOKAHEAD = 15 * 60
+# Seconds today's calendar events are reused by a worker (writes invalidate them sooner)
+CALENDAR_CACHE_TTL = 60
+# Path of the calendar served by this module; its slides are rendered natively by the player
+CALENDAR_PATH = '/ds/calendar'
+# Epoch (milliseconds) the timelines of synchronized screens are counted from; shared by every screen
+# so that each one computes the same slide at the same moment without coordination
+SYNC_EPOCH = 0
+
+# Columns of ds.asset a slide needs; never the binary ``file``
+_SLIDE_ASSET_FIELDS = [
+    'name', 'type', 'duration', 'cache_content', 'url',
+    'checksum', 'processing_state', 'file_mimetype', 'write_date', 'create_date',
+]
+
+
+def _preview_screen(playlist):
+    """Stand-in for the ``screen`` of QWeb templates rendered outside of a screen"""
+    # Fake a transient screen context
+    class O:
+        pass
+    screen = O()
+    screen.name = f"Playlist #{playlist.id}"
+    screen.token = ""
+    return screen
+
+
+def _render_qweb_slide(asset, playlist, screen):
+    """Render the template of a QWeb asset, reusing the output for ``qweb_cache_ttl`` seconds.
+
+    The cache key holds the database, the template, the asset and the
+    playlist (and the screen, unless the asset shares its render across
+    screens), plus their versions so that editing them renders again right
+    away.
+    """
+    if not asset.qweb_key:
+        return ''
+    if asset.qweb_share_render or not screen:
+        screen = None
+    key = (
+        request.db, asset.qweb_key, asset.id, asset.write_date,
+        playlist.id, playlist.payload_version,
+        screen.id if screen else None,
+    )
+    ttl = max(asset.qweb_cache_ttl, 0)
+    html = render_cache.get(key) if ttl else None
+    if html is not None:
+        return html
+    start = time.perf_counter()
+    try:
+        html = str(request.env['ir.ui.view']._render_template(asset.qweb_key, {
+            'asset': asset,
+            'playlist': playlist,
+            'screen': screen or _preview_screen(playlist),
+        }))
+        metrics.observe('ds_signage_qweb_render_seconds', time.perf_counter() - start, template=asset.qweb_key)
+    except Exception as e:  # noqa: BLE001
+        _logger.exception("Failed to render qweb template %s: %s", asset.qweb_key, e)
+        # Not cached: the next request retries the template
+        return f"<div class=\"ds-error\">QWeb template '{asset.qweb_key}' not found</div>"
+    if ttl:
+        render_cache.set(key, html, ttl)
+    return html
+
+
+def _prepare_slides(playlist, screen_token=None, hidden_item_ids=()):
+    """Build the slide list of a playlist with a fixed number of queries.
+
+    The items are read in one ``search_read``, their assets in one batched
+    fetch of the columns above and the MP4 renditions of their videos in one
+    more ``search_read``, whatever the length of the playlist. QWeb
+    slides only carry the URL of their fragment, which the player fetches
+    just before showing them, so no template is rendered here. Items in
+    ``hidden_item_ids`` are outside their time window and left out.
+    """
+    domain = [('playlist_id', '=', playlist.id)]
+    if hidden_item_ids:
+        domain.append(('id', 'not in', list(hidden_item_ids)))
+    items = request.env['ds.playlist.item'].sudo().search_read(
+        domain,
+        ['asset_id', 'duration_override'],
+        order='sequence, id',
+        load=None,
+    )
+    assets = request.env['ds.asset'].sudo().browse({item['asset_id'] for item in items})
+    assets.fetch(_SLIDE_ASSET_FIELDS)
+    # Records of the fetched recordset share its prefetch set: no per-slide query
+    assets_by_id = {asset.id: asset for asset in assets}
+    # Videos with a rendition are served as MP4 whatever was uploaded (e.g. a .mov)
+    video_ids = [asset.id for asset in assets if asset.type == 'video']
+    mp4_asset_ids = {
+        rendition['asset_id'] for rendition in request.env['ds.asset.rendition'].sudo().search_read(
+            [('asset_id', 'in', video_ids), ('mimetype', '=', 'video/mp4'), ('attachment_id', '!=', False)],
+            ['asset_id'],
+            load=None,
+        )
+    } if video_ids else set()
+    slides = []
+    for item in items:
+        asset = assets_by_id[item['asset_id']]
+        s = {
+            'id': asset.id,
+            'name': asset.name,
+            'type': asset.type,
+            'duration': item['duration_override'] or asset.duration or 10,
+            'cache_content': asset.cache_content,
+        }
+        if asset.type in ('image', 'video'):
+            # Content-hash version: cached forever, refetched only when the file changes
+            s['src'] = asset._get_content_url()
+            # MIME type the content URL serves, for the player's <source type> hint
+            s['mimetype'] = 'video/mp4' if asset.id in mp4_asset_ids else asset.file_mimetype or None
+        elif asset.type == 'video_url':
+            s['src'] = asset.url
+        elif asset.type == 'youtube':
+            s['src'] = _youtube_embed_from_url(asset.url or '')
+        elif asset.type in ('webpage', 'calendar'):
+            s['src'] = asset.url
+            calendar_url = urlparse(asset.url or '')
+            if (asset.type == 'calendar' and calendar_url.path == CALENDAR_PATH
+                    and calendar_url.netloc in ('', request.httprequest.host)):
+                s['json_src'] = f"{CALENDAR_PATH}.json"
+        elif asset.type == 'qweb':
+            query = {'playlist': playlist.id}
+            if screen_token:
+                query['screen'] = screen_token
+            s['html_src'] = f"/ds/a/{asset.id}/html?{urlencode(query)}"
+        slides.append(s)
+    return slides
+
+
+def _payload_revision(slides, meta, next_transition=None, zones=None):
+    return hashlib.sha1(json.dumps([slides, meta, next_transition, zones or {}], sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _prepare_screen_payload(screen, playlist, hidden_item_ids=(), next_transition=None):
+    """Build the slides and player settings of a screen for one segment of its schedule.
+
+    Returns a dict with ``slides``, ``zones`` (the slides of each layout zone
+    with a playlist of its own, by zone id), ``meta``, ``next_transition``
+    (epoch in milliseconds of the next schedule change, or None) and
+    ``revision``, a short hash of them that changes whenever anything the
+    player displays changes. ``meta['layout']`` lists the zones, or is None
+    when the screen schedule fills the whole screen.
+    """
+    slides = _prepare_slides(playlist, screen.token, hidden_item_ids) if playlist else []
+    zones = {
+        str(zone.id): _prepare_slides(zone.playlist_id, screen.token, hidden_item_ids)
+        for zone in screen.zone_ids
+        if zone.content == 'playlist' and zone.playlist_id
+    }
+
+    # Prepare preloader data if configured
+    preloader_data = None
+    if screen.preloader_asset_id:
+        preloader = screen.preloader_asset_id
+        preloader_data = {
+            'type': preloader.type,
+            'src': preloader._get_content_url() if preloader.type in ('image', 'video') else None,
+        }
+
+    meta = {
+        'title': f"{playlist.name or screen.name} — Digital Signage",
+        'playlist_id': playlist.id,
+        'screen_token': screen.token,
+        'auto_unmute': playlist.auto_unmute,
+        'preloader': preloader_data,
+        'show_fullscreen_button': screen.show_fullscreen_button,
+        'layout': screen.zone_ids._get_layout() or None,
+        'cache_slides': screen.cache_slides,
+        'preload_next_slide': screen.preload_next_slide,
+        'preload_depth': screen.preload_depth,
+        'slide_cache': {
+            'max_items': screen.slide_cache_max_items,
+            'max_mb': screen.slide_cache_max_mb,
+        },
+        'manifest_url': f"/ds/s/{screen.token}/manifest",
+        'manifest_poll_interval': screen.manifest_poll_interval,
+        'bus': {
+            'channel': screen._get_bus_channel(screen.token),
+            'version': WebsocketConnectionHandler._VERSION,
+        },
+        'sync': {
+            'group': screen.sync_group,
+            'epoch': SYNC_EPOCH,
+            'time_url': '/ds/time',
+        } if screen.sync_group else None,
+        'ping_url': f"/ds/s/{screen.token}/ping",
+        'ping_interval': screen._ping_interval,
+        'events_url': f"/ds/s/{screen.token}/events",
+        'events_flush_interval': EVENTS_FLUSH_INTERVAL,
+        'telemetry_url': f"/ds/s/{screen.token}/telemetry",
+        'telemetry_interval': TELEMETRY_INTERVAL,
+        'offline': {
+            'service_worker': '/ds/sw.js',
+            'quota_mb': screen.offline_cache_mb,
+        } if screen.offline_enabled else None,
+    }
+    return {
+        'slides': slides,
+        'zones': zones,
+        'meta': meta,
+        'next_transition': next_transition,
+        'revision': _payload_revision(slides, meta, next_transition, zones),
+    }
+
+
+def _prepare_playlist_payload(playlist):
+    """Build the slides and player settings of a bare playlist (``/ds/p/<id>``)"""
+    slides = _prepare_slides(playlist)
+
+    meta = {
+        'title': f"{playlist.name} — Digital Signage",
+        'playlist_id': playlist.id,
+        'auto_unmute': playlist.auto_unmute,
+        'preloader': None,
+        'show_fullscreen_button': True,
+        'cache_slides': False,
+        'preload_next_slide': False,
+    }
+    return {'slides': slides, 'meta': meta, 'revision': _payload_revision(slides, meta)}
+
+
+def _serialize_payload(payload):
+    """Add the JSON documents served from a payload, so cache hits skip json.dumps"""
+    payload['slides_json'] = json.dumps(payload['slides'])
+    payload['zones_json'] = json.dumps(payload.get('zones') or {})
+    next_transition = payload.get('next_transition')
+    payload['meta_json'] = json.dumps(dict(payload['meta'], revision=payload['revision'], next_transition=next_transition))
+    payload['manifest_json'] = json.dumps({
+        'slides': payload['slides'],
+        'zones': payload.get('zones') or {},
+        'meta': payload['meta'],
+        'next_transition': next_transition,
+        'revision': payload['revision'],
+    })
+    return payload
+
+
+def _get_screen_payload(token, at=None):
+    """Return ``(screen_id, payload)`` for a screen token, from the worker cache while current.
+
+    The payload is the one of the schedule segment running at ``at`` (epoch
+    seconds, now by default): the segment comes from the screen's schedule
+    index, a bisection in a list resolved ahead and cached per worker, and
+    the payload is cached per segment.
+    """
+    Screen = request.env['ds.screen'].sudo()
+    screen_id, version = Screen._get_payload_version(token)
+    if not screen_id:
+        return None, None
+    now = time.time()
+    at = now if at is None else min(max(at, now), now + MANIFEST_MAX_LOOKAHEAD)
+    # Versions start over in each database: the keys carry the database name
+    index = schedule_cache.get((request.db, 'screen', token), version)
+    if index is None or not index.covers(at):
+        index = Screen.browse(screen_id)._build_schedule_index(now)
+        schedule_cache.set((request.db, 'screen', token), version, index)
+    segment_start, (playlist_id, hidden_item_ids), next_transition = index.lookup(at)
+    key = (request.db, 'screen', token, segment_start)
+    payload = payload_cache.get(key, version)
+    if payload is None:
+        payload = _serialize_payload(_prepare_screen_payload(
+            Screen.browse(screen_id),
+            request.env['ds.playlist'].sudo().browse(playlist_id),
+            hidden_item_ids,
+            next_transition * 1000 if next_transition else None,
+        ))
+        payload_cache.set(key, version, payload)
+    return screen_id, payload
+
+
+def _get_playlist_payload(playlist):
+    """Return the payload of a playlist, from the worker cache while current"""
+    key = (request.db, 'playlist', playlist.id)
+    version = playlist.payload_version
+    payload = payload_cache.get(key, version)
+    if payload is None:
+        payload = _serialize_payload(_prepare_playlist_payload(playlist))
+        payload_cache.set(key, version, payload)
+    return payload
+
+
+def _get_calendar_today():
+    """Today's calendar events, shared by every calendar slide of every screen.
+
+    Cached per worker for ``CALENDAR_CACHE_TTL`` seconds, and dropped as soon
+    as a ``calendar.event`` is created, written or deleted, which bumps the
+    version read here. Returns a dict with the ``date``, the ``events`` (plain
+    dicts), their ``json`` and an ``etag``; the rendered ``html`` is added by
+    the first request that needs it.
+    """
+    Event = request.env['calendar.event'].sudo()
+    today = datetime.now().date()
+    key = (request.db, today, Event._ds_get_signage_version())
+    calendar = calendar_cache.get(key)
+    if calendar is not None:
+        return calendar
+    try:
+        events = Event.search_read([
+            ('start', '>=', today),
+            ('start', '<', today + timedelta(days=1)),
+        ], ['name', 'location', 'start', 'stop', 'allday'], order='start asc', limit=10)
+    except Exception as e:  # noqa: BLE001
+        _logger.warning("Calendar events error: %s", e)
+        events = []
+    events = [{
+        'name': event['name'],
+        'location': event['location'] or '',
+        'start': fields.Datetime.to_string(event['start']),
+        'stop': fields.Datetime.to_string(event['stop']),
+        'time': event['start'].strftime('%H:%M'),
+        'allday': event['allday'],
+    } for event in events]
+    data = json.dumps({'date': fields.Date.to_string(today), 'events': events})
+    calendar = {
+        'date': today,
+        'events': events,
+        'json': data,
+        'etag': hashlib.sha1(data.encode()).hexdigest()[:16],
+        'html': None,
+    }
+    calendar_cache.set(key, calendar, CALENDAR_CACHE_TTL)
+    return calendar
+
+
+def _calendar_response(calendar, body, content_type):
+    headers = [
+        ('Cache-Control', 'no-cache'),
+        ('ETag', f'"{calendar["etag"]}"'),
+    ]
+    if _etag_matches(calendar['etag']):
+        return request.make_response('', headers=headers, status=304)
+    headers.append(('Content-Type', content_type))
+    return request.make_response(body, headers=headers)
+
+
+def _etag_matches(etag):
+    """Whether the request's If-None-Match already names ``etag``"""
+    return etag in request.httprequest.if_none_match
+
+
 class DsSignageController(http.Controller):
 
     @http.route(['/ds/s/<string:token>'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('screen_player')
     def screen_player(self, token, **kwargs):
-        Screen = request.env['ds.screen'].sudo()
-        screen = Screen.search([('token', '=', token), ('active', '=', True)], limit=1)
-        if not screen or not screen.playlist_id:
+        screen_id, payload = _get_screen_payload(token)
+        if payload is None:
             return request.not_found()
-        playlist = screen.playlist_id
-        slides = []
-        for item in playlist.item_ids.sorted(key=lambda r: (r.sequence, r.id)):
-            asset = item.asset_id
-            s = {
-                'id': asset.id,
-                'name': asset.name,
-                'type': asset.type,
-                'duration': item.duration_override or asset.duration or 10,
-                'cache_content': asset.cache_content if hasattr(asset, 'cache_content') else True,
-            }
-            if asset.type in ('image', 'video'):
-                # Cache buster so browser refetches when asset changes and to avoid stale headers
-                ver_dt = asset.write_date or asset.create_date
-                ver = ver_dt.strftime('%Y%m%d%H%M%S') if ver_dt else '0'
-                s['src'] = f"/ds/a/{asset.id}/content?v={ver}"
-            elif asset.type == 'video_url':
-                s['src'] = asset.url
-            elif asset.type == 'youtube':
-                s['src'] = _youtube_embed_from_url(asset.url or '')
-            elif asset.type in ('webpage', 'calendar'):
-                s['src'] = asset.url
-            elif asset.type == 'qweb':
-                html = ''
-                if asset.qweb_key:
-                    try:
-                        html = request.env['ir.ui.view']._render_template(asset.qweb_key, {
-                            'asset': asset,
-                            'playlist': playlist,
-                            'screen': screen,
-                        })
-                    except Exception as e:  # noqa: BLE001
-                        _logger.exception("Failed to render qweb template %s: %s", asset.qweb_key, e)
-                        html = f"<div class=\"ds-error\">QWeb template '{asset.qweb_key}' not found</div>"
-                s['html'] = html
-            slides.append(s)
-
-        # Prepare preloader data if configured
-        preloader_data = None
-        if screen.preloader_asset_id:
-            preloader = screen.preloader_asset_id
-            ver_dt = preloader.write_date or preloader.create_date
-            ver = ver_dt.strftime('%Y%m%d%H%M%S') if ver_dt else '0'
-            preloader_data = {
-                'type': preloader.type,
-                'src': f"/ds/a/{preloader.id}/content?v={ver}" if preloader.type in ('image', 'video') else None,
-            }
-        
         values = {
-            'screen': screen,
-            'playlist': playlist,
-            'slides_json': json.dumps(slides),
-            'meta_json': json.dumps({
-                'title': f"{playlist.name} — Digital Signage", 
-                'playlist_id': playlist.id, 
-                'screen_token': screen.token, 
-                'auto_unmute': playlist.auto_unmute,
-                'preloader': preloader_data,
-                'show_fullscreen_button': screen.show_fullscreen_button,
-                'cache_slides': screen.cache_slides,
-                'preload_next_slide': screen.preload_next_slide
-            }),
-            'title': f"{playlist.name} — Digital Signage",
+            'screen': request.env['ds.screen'].sudo().browse(screen_id),
+            'playlist': request.env['ds.playlist'].sudo().browse(payload['meta']['playlist_id']),
+            'slides_json': payload['slides_json'],
+            'zones_json': payload['zones_json'],
+            'meta_json': payload['meta_json'],
+            'title': payload['meta']['title'],
         }
         return request.render('ds_signage.player', values)
 
+    @http.route(['/ds/s/<string:token>/manifest'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('screen_manifest')
+    def screen_manifest(self, token, **kwargs):
+        """Compact JSON description of what a screen plays.
+
+        Players poll it with the revision of what they display as ETag; an
+        unchanged playlist is answered with an empty 304. ``at`` (epoch in
+        milliseconds, at most a few minutes ahead) asks for what will play
+        then, so players can fetch their next schedule transition early.
+        """
+        at = kwargs.get('at')
+        at = int(at) / 1000 if at and at.isdigit() else None
+        _screen_id, payload = _get_screen_payload(token, at)
+        if payload is None:
+            return request.not_found()
+        headers = [
+            ('Cache-Control', 'no-cache'),
+            ('ETag', f'"{payload["revision"]}"'),
+        ]
+        if _etag_matches(payload['revision']):
+            return request.make_response('', headers=headers, status=304)
+        headers.append(('Content-Type', 'application/json'))
+        return request.make_response(payload['manifest_json'], headers=headers)
+
+    @http.route(['/ds/time'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('server_time')
+    def server_time(self, **kwargs):
+        """Server clock for the players of sync groups (epoch milliseconds).
+
+        ``t1`` is when the request reached the controller and ``t2`` when the
+        response left it; with their own send and receive times, players
+        estimate their clock offset and the network delay as NTP does.
+        """
+        t1 = time.time() * 1000
+        body = json.dumps({'t1': t1, 't2': time.time() * 1000})
+        return request.make_response(body, headers=[
+            ('Content-Type', 'application/json'),
+            ('Cache-Control', 'no-store'),
+        ])
+
+    @http.route(['/ds/s/<string:token>/ping'], type='http', auth='public', methods=['POST'], csrf=False)
+    @instrument('screen_ping')
+    def screen_ping(self, token, **kwargs):
+        """Heartbeat of a player.
+
+        Only buffered in memory: each worker writes the pings it collected to
+        ``last_ping`` with one UPDATE, from whichever ping comes after the
+        interval or else from a timer. Unknown tokens are simply never matched.
+        """
+        pings = heartbeats.record(request.db, token)
+        if pings:
+            request.env['ds.screen'].sudo()._write_heartbeats(pings)
+        return request.make_response('', status=204)
+
+    @http.route(['/ds/s/<string:token>/events'], type='http', auth='public', methods=['POST'], csrf=False)
+    @instrument('screen_events')
+    def screen_events(self, token, **kwargs):
+        """Proof-of-play upload: a JSON array of events buffered by the player"""
+        if (request.httprequest.content_length or 0) > EVENTS_MAX_BODY:
+            return request.make_response('', status=413)
+        screen = request.env['ds.screen'].sudo().search([('token', '=', token), ('active', '=', True)], limit=1)
+        if not screen:
+            return request.not_found()
+        try:
+            events = json.loads(request.httprequest.get_data(as_text=True) or '[]')
+        except ValueError:
+            return request.make_response('', status=400)
+        if not isinstance(events, list):
+            return request.make_response('', status=400)
+        request.env['ds.play.event'].sudo()._ingest(screen, events)
+        return request.make_response('', status=204)
+
+    @http.route(['/ds/s/<string:token>/telemetry'], type='http', auth='public', methods=['POST'], csrf=False)
+    @instrument('screen_telemetry')
+    def screen_telemetry(self, token, **kwargs):
+        """Performance summary of a player: first frame times, stalls, dropped frames and heap, per asset"""
+        if (request.httprequest.content_length or 0) > EVENTS_MAX_BODY:
+            return request.make_response('', status=413)
+        screen = request.env['ds.screen'].sudo().search([('token', '=', token), ('active', '=', True)], limit=1)
+        if not screen:
+            return request.not_found()
+        try:
+            summary = json.loads(request.httprequest.get_data(as_text=True) or '{}')
+        except ValueError:
+            return request.make_response('', status=400)
+        if not isinstance(summary, dict):
+            return request.make_response('', status=400)
+        request.env['ds.player.telemetry'].sudo()._ingest(screen, summary)
+        return request.make_response('', status=204)
+
     @http.route(['/ds/p/<int:playlist_id>'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('playlist_player')
     def playlist_player(self, playlist_id, **kwargs):
         playlist = request.env['ds.playlist'].sudo().browse(int(playlist_id))
         if not playlist or not playlist.exists():
             return request.not_found()
-        # Fake a transient screen context
-        class O:
-            pass
-        screen = O()
-        screen.name = f"Playlist #{playlist.id}"
-        screen.token = ""
-        slides = []
-        for item in playlist.item_ids.sorted(key=lambda r: (r.sequence, r.id)):
-            asset = item.asset_id
-            s = {
-                'id': asset.id,
-                'name': asset.name,
-                'type': asset.type,
-                'duration': item.duration_override or asset.duration or 10,
-                'cache_content': asset.cache_content if hasattr(asset, 'cache_content') else True,
-            }
-            if asset.type in ('image', 'video'):
-                s['src'] = f"/ds/a/{asset.id}/content"
-            elif asset.type == 'video_url':
-                s['src'] = asset.url
-            elif asset.type == 'youtube':
-                s['src'] = _youtube_embed_from_url(asset.url or '')
-            elif asset.type in ('webpage', 'calendar'):
-                s['src'] = asset.url
-            elif asset.type == 'qweb':
-                html = ''
-                if asset.qweb_key:
-                    try:
-                        html = request.env['ir.ui.view']._render_template(asset.qweb_key, {
-                            'asset': asset,
-                            'playlist': playlist,
-                            'screen': screen,
-                        })
-                    except Exception as e:  # noqa: BLE001
-                        _logger.exception("Failed to render qweb template %s: %s", asset.qweb_key, e)
-                        html = f"<div class=\"ds-error\">QWeb template '{asset.qweb_key}' not found</div>"
-                s['html'] = html
-            slides.append(s)
-
+        payload = _get_playlist_payload(playlist)
         values = {
-            'screen': screen,
+            'screen': request.env['ds.screen'],
             'playlist': playlist,
-            'slides_json': json.dumps(slides),
-            'meta_json': json.dumps({
-                'title': f"{playlist.name} — Digital Signage", 
-                'playlist_id': playlist.id, 
-                'auto_unmute': playlist.auto_unmute,
-                'preloader': None,
-                'show_fullscreen_button': True,
-                'cache_slides': False,
-                'preload_next_slide': False
-            }),
-            'title': f"{playlist.name} — Digital Signage",
+            'slides_json': payload['slides_json'],
+            'zones_json': payload['zones_json'],
+            'meta_json': payload['meta_json'],
+            'title': payload['meta']['title'],
         }
         return request.render('ds_signage.player', values)
 
     @http.route(['/ds/a/<int:asset_id>/content'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('asset_content')
     def asset_content(self, asset_id, **kwargs):
         asset = request.env['ds.asset'].sudo().browse(int(asset_id))
-        _logger.info(f"Asset content request for ID {asset_id}: exists={asset.exists()}, has_file={bool(asset.file)}, type={asset.type if asset.exists() else 'N/A'}")
-        
         if not asset or not asset.exists():
-            _logger.warning(f"Asset {asset_id} not found")
+            _logger.warning("Asset %s not found", asset_id)
             return request.not_found()
-            
-        if not asset.file:
-            _logger.warning(f"Asset {asset_id} has no file content")
+        # A URL carrying the current content version never changes meaning:
+        # let browsers and proxies keep it forever. Anything else must
+        # revalidate, which costs a 304 when the ETag still matches.
+        immutable = bool(kwargs.get('v')) and kwargs['v'] == asset._get_content_version()
+        return self._asset_content_response(asset, immutable, **kwargs)
+
+    @http.route(['/ds/c/<string:checksum>'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('content_by_hash')
+    def content_by_hash(self, checksum, **kwargs):
+        """Uploaded file by content hash: assets holding the same bytes share one URL, hence one cache entry"""
+        if not re.fullmatch(r'[0-9a-f]{40}', checksum):
             return request.not_found()
-            
-        try:
-            data = base64.b64decode(asset.file)
-            _logger.info(f"Asset {asset_id}: decoded {len(data)} bytes, mimetype={asset.file_mimetype}")
-        except Exception as e:
-            _logger.error(f"Failed to decode asset {asset_id}: {e}")
+        assets = request.env['ds.asset'].sudo().with_context(active_test=False).search([('checksum', '=', checksum)], order='id')
+        # Prefer a copy whose renditions are ready
+        asset = next((a for a in assets if a.processing_state != 'pending'), assets[:1])
+        if not asset:
+            return request.not_found()
+        # The bytes behind a hash never change; only renditions being generated
+        # (``p`` marker in the URL) may still change what is served
+        immutable = not kwargs.get('p') and asset.processing_state != 'pending'
+        return self._asset_content_response(asset, immutable, **kwargs)
+
+    def _asset_content_response(self, asset, immutable, **kwargs):
+        asset_id = asset.id
+
+        # Never read ``asset.file``: that would load and base64-encode the
+        # whole attachment. Stream straight from the backing ir.attachment.
+        attachment = asset._get_file_attachment()
+        if not attachment:
+            _logger.warning("Asset %s has no file content", asset_id)
             return request.not_found()
-            
+
         # Determine proper MIME type with strong preference for the asset.type
         raw_mime = (asset.file_mimetype or '').lower()
         filename = asset.file_name or asset.name or ''
@@ -237,105 +605,122 @@ class DsSignageController(http.Controller):
         else:
             mimetype = raw_mime or (mime_from_ext(name_lower) or 'application/octet-stream')
 
-        # As a final guard, if asset says it's an image but MIME doesn't, sniff the bytes
+        # As a final guard, if asset says it's an image but MIME doesn't, sniff the first bytes
         if asset.type == 'image' and not (mimetype or '').startswith('image/'):
-            sniffed = sniff_image_mime(data)
+            sniffed = sniff_image_mime(asset._read_file_head(attachment))
             if sniffed:
-                _logger.info(f"Asset {asset_id}: Overriding MIME to '{sniffed}' based on image signature")
+                _logger.debug("Asset %s: Overriding MIME to '%s' based on image signature", asset_id, sniffed)
                 mimetype = sniffed
 
-        _logger.info(f"Asset {asset_id}: Using MIME type '{mimetype}' for file '{filename}', asset.type={asset.type}, raw_mime={asset.file_mimetype}")
+        # Serve a rendition when one fits: the smallest image at least as wide
+        # as the screen (``w``, in device pixels), in WebP when the client
+        # takes it, or the web-optimized MP4 of a video.
+        width = kwargs.get('w')
+        width = int(width) if width and width.isdigit() else None
+        accept_webp = 'image/webp' in request.httprequest.headers.get('Accept', '')
+        rendition = request.env['ds.asset.rendition'].sudo()._pick(asset, width=width, accept_webp=accept_webp)
+        etag = asset.checksum or attachment.checksum
+        if rendition:
+            attachment = rendition.attachment_id
+            mimetype = rendition.mimetype
+            etag = attachment.checksum
+            filename = attachment.name
 
-        # Enable browser streaming by handling HTTP Range requests (videos only)
-        total_size = len(data)
-        range_header = request.httprequest.headers.get('Range')
-        disposition_name = filename or f"asset_{asset_id}"
-        is_video = (mimetype or '').startswith('video/')
+        # Stream from the filestore: werkzeug seeks to the requested byte range
+        # (206 Partial Content) and sends the file in small blocks (or hands it
+        # to the proxy when x_sendfile is enabled), so memory stays flat
+        # whatever the size of the file. If-None-Match / If-Modified-Since are
+        # answered with 304 from the ETag and Last-Modified set here.
+        stream = Stream.from_attachment(attachment)
+        stream.mimetype = mimetype
+        stream.download_name = filename or f"asset_{asset_id}"
+        stream.etag = etag
+        stream.last_modified = attachment.write_date
+        stream.conditional = True
+        response = stream.get_response(as_attachment=False, immutable=immutable, content_security_policy=None)
+        metrics.inc('ds_signage_content_responses_total',
+                    kind={206: 'range', 304: 'not_modified'}.get(response.status_code, 'full'))
+        if immutable:
+            response.headers['Cache-Control'] = f'public, max-age={http.STATIC_CACHE_LONG}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'public, no-cache'
+        response.headers['Accept-Ranges'] = 'bytes'
+        if asset.type == 'image' and width:
+            response.headers['Vary'] = 'Accept'
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Expose-Headers'] = 'Content-Type, Content-Length, Accept-Ranges, Content-Range, ETag, Last-Modified'
+        response.headers['Cross-Origin-Resource-Policy'] = 'cross-origin'
+        return response
 
-        if is_video and range_header:
-            # Typical format: 'bytes=start-end'
-            _logger.info(f"Asset {asset_id}: Received Range header '{range_header}' (total {total_size} bytes)")
-            try:
-                units, rng = range_header.split('=')
-                if units.strip() != 'bytes':
-                    raise ValueError('Unsupported range unit')
-                start_str, end_str = (rng or '').split('-')
-                if start_str == '':
-                    # suffix length: '-N' means last N bytes
-                    length = int(end_str)
-                    start = max(total_size - length, 0)
-                    end = total_size - 1
-                else:
-                    start = int(start_str)
-                    end = int(end_str) if end_str else total_size - 1
-                # Clamp values
-                if start < 0 or end < start or start >= total_size:
-                    raise ValueError('Invalid range values')
-                end = min(end, total_size - 1)
-
-                chunk = data[start:end + 1]
-                headers = [
-                    ('Content-Type', mimetype),
-                    ('Cache-Control', 'public, max-age=3600'),
-                    ('Accept-Ranges', 'bytes'),
-                    ('Content-Range', f'bytes {start}-{end}/{total_size}'),
-                    ('Content-Length', str(len(chunk))),
-                    ('Content-Disposition', f'inline; filename="{disposition_name}"'),
-                    ('Access-Control-Allow-Origin', '*'),
-                    ('Access-Control-Expose-Headers', 'Content-Type, Content-Length, Accept-Ranges, Content-Range'),
-                    ('Cross-Origin-Resource-Policy', 'cross-origin'),
-                ]
-                response = request.make_response(chunk, headers=headers)
-                # Set Partial Content status for range responses
-                try:
-                    response.status_code = 206
-                except Exception:  # noqa: BLE001
-                    pass
-                return response
-            except Exception as e:  # noqa: BLE001
-                _logger.warning(f"Asset {asset_id}: Failed to parse Range header '{range_header}': {e}")
-                # Fall back to full content
-
-        # No (valid) Range header or not a video: return full content
+    @http.route(['/ds/a/<int:asset_id>/html'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('asset_html')
+    def asset_html(self, asset_id, playlist=None, screen=None, **kwargs):
+        """HTML fragment of a QWeb slide, fetched by the player just before the slide is due"""
+        asset = request.env['ds.asset'].sudo().browse(int(asset_id))
+        if not asset.exists() or asset.type != 'qweb':
+            return request.not_found()
+        playlist_id = int(playlist) if playlist and playlist.isdigit() else 0
+        playlist = request.env['ds.playlist'].sudo().browse(playlist_id).exists()
+        screen = request.env['ds.screen'].sudo().search([('token', '=', screen), ('active', '=', True)], limit=1) if screen else None
+
+        html = _render_qweb_slide(asset, playlist, screen)
+        etag = hashlib.sha1(html.encode()).hexdigest()[:16]
+        ttl = max(asset.qweb_cache_ttl, 0)
         headers = [
-            ('Content-Type', mimetype),
-            ('Cache-Control', 'public, max-age=3600'),
-            ('Content-Length', str(total_size)),
-            ('Content-Disposition', f'inline; filename="{disposition_name}"'),
-            ('Access-Control-Allow-Origin', '*'),
-            ('Access-Control-Expose-Headers', 'Content-Type, Content-Length'),
-            ('Cross-Origin-Resource-Policy', 'cross-origin'),
+            ('Cache-Control', f'public, max-age={ttl}' if ttl else 'no-cache'),
+            ('ETag', f'"{etag}"'),
         ]
-        if is_video:
-            headers.append(('Accept-Ranges', 'bytes'))
-        return request.make_response(data, headers=headers)
+        if _etag_matches(etag):
+            return request.make_response('', headers=headers, status=304)
+        headers.append(('Content-Type', 'text/html; charset=utf-8'))
+        return request.make_response(html, headers=headers)
+
+    @http.route(['/ds/sw.js'], type='http', auth='public', methods=['GET'], csrf=False)
+    def service_worker(self, **kwargs):
+        """Offline service worker; served under /ds/ so that it may control the player pages"""
+        with file_open('ds_signage/static/src/js/sw.js', 'rb') as f:
+            body = f.read()
+        headers = [
+            ('Content-Type', 'text/javascript; charset=utf-8'),
+            ('Cache-Control', 'no-cache'),
+            ('Service-Worker-Allowed', '/ds/'),
+        ]
+        return request.make_response(body, headers=headers)
+
+    @http.route(['/ds/metrics'], type='http', auth='public', methods=['GET'], csrf=False)
+    def prometheus_metrics(self, **kwargs):
+        """Request metrics of the worker answering, in the Prometheus text format.
+
+        Disabled (404) until the ``ds_signage.metrics_token`` system parameter
+        is set; scrapers send it as a bearer token. Each worker process
+        reports its own counters.
+        """
+        token = request.env['ir.config_parameter'].sudo().get_param('ds_signage.metrics_token')
+        if not token:
+            return request.not_found()
+        authorization = request.httprequest.headers.get('Authorization', '')
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+            return request.make_response('', status=401, headers=[('WWW-Authenticate', 'Bearer')])
+        return request.make_response(metrics.export(), headers=[
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+            ('Cache-Control', 'no-store'),
+        ])
 
     @http.route(['/ds/calendar'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('calendar')
     def calendar_events(self, **kwargs):
         """Public calendar events list for embedding in digital signage"""
-        try:
-            # Get today's events from calendar.event model
-            from datetime import datetime, timedelta
-            today = datetime.now().date()
-            tomorrow = today + timedelta(days=1)
-            
-            # Search for today's events
-            events = request.env['calendar.event'].sudo().search([
-                ('start', '>=', today),
-                ('start', '<', tomorrow),
-            ], order='start asc', limit=10)
-            
-            values = {
-                'events': events,
-                'today': today,
-            }
-            return request.render('ds_signage.calendar_list', values)
-            
-        except Exception as e:
-            _logger.warning(f"Calendar events error: {e}")
-            # Fallback with empty events
-            values = {
-                'events': [],
-                'today': datetime.now().date(),
-            }
-            return request.render('ds_signage.calendar_list', values)
+        calendar = _get_calendar_today()
+        if calendar.get('html') is None:
+            calendar['html'] = str(request.env['ir.ui.view']._render_template('ds_signage.calendar_list', {
+                'events': calendar['events'],
+                'today': calendar['date'],
+            }))
+        return _calendar_response(calendar, calendar['html'], 'text/html; charset=utf-8')
+
+    @http.route(['/ds/calendar.json'], type='http', auth='public', methods=['GET'], csrf=False)
+    @instrument('calendar_json')
+    def calendar_events_json(self, **kwargs):
+        """Today's events as JSON, rendered by the player itself; a refresh is usually a 304"""
+        calendar = _get_calendar_today()
+        return _calendar_response(calendar, calendar['json'], 'application/json')
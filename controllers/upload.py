@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo import _, http
+from odoo.exceptions import UserError
+from odoo.http import request
+
+from odoo.addons.ds_signage.models.asset_upload import UPLOAD_MAX_CHUNK
+from odoo.addons.ds_signage.models.metrics import instrument
+
+
+class DsUploadController(http.Controller):
+    """Chunked, resumable uploads of large asset files.
+
+    ``start`` opens (or resumes) an upload and tells how many bytes the
+    server already has; the client then POSTs the rest as raw chunks of at
+    most ``UPLOAD_MAX_CHUNK`` bytes, each at the offset it starts at, and
+    calls ``finish`` once all are in. Chunks are streamed to disk, so the
+    memory of the worker does not depend on the size of the file.
+    """
+
+    def _get_upload(self, token):
+        """The upload of ``token``, if the current user started it"""
+        return request.env['ds.asset.upload'].search([
+            ('token', '=', token),
+            ('create_uid', '=', request.env.uid),
+        ], limit=1)
+
+    @http.route(['/ds/upload/start'], type='json', auth='user', methods=['POST'])
+    def upload_start(self, asset_id, file_name=None, token=None):
+        """Open an upload into ``asset_id``, or resume the one of ``token``; answers ``{token, asset_id, received, chunk_size}``"""
+        if token:
+            upload = self._get_upload(token)
+            if upload:
+                return upload._get_status()
+        asset = request.env['ds.asset'].browse(asset_id).exists()
+        if not asset:
+            raise UserError(_("The asset to upload into does not exist."))
+        asset.check_access('write')
+        upload = request.env['ds.asset.upload'].create({
+            'asset_id': asset.id,
+            'file_name': file_name or asset.name,
+        })
+        return upload._get_status()
+
+    @http.route(['/ds/upload/<string:token>'], type='http', auth='user', methods=['POST'])
+    @instrument('upload_chunk')
+    def upload_chunk(self, token, offset=0, **kwargs):
+        """Append the raw request body at ``offset``; answers ``{received}``, with 409 when the offset is not the end of the upload or another chunk is being written.
+
+        The CSRF token goes in the query string, the body being the bytes of the chunk.
+        """
+        length = request.httprequest.content_length
+        if length is None:
+            return request.make_response('', status=411)
+        if length > UPLOAD_MAX_CHUNK:
+            return request.make_response('', status=413)
+        upload = self._get_upload(token)
+        if not upload:
+            return request.not_found()
+        headers = [('Content-Type', 'application/json')]
+        try:
+            received = upload._append(int(offset), request.httprequest.stream, length)
+        except ValueError:
+            return request.make_response('', status=400)
+        except UserError:
+            body = json.dumps({'received': upload._get_received()})
+            return request.make_response(body, headers=headers, status=409)
+        return request.make_response(json.dumps({'received': received}), headers=headers)
+
+    @http.route(['/ds/upload/<string:token>/finish'], type='json', auth='user', methods=['POST'])
+    def upload_finish(self, token):
+        """Attach the uploaded file to its asset; answers the asset's ``id``, ``file_name``, ``file_mimetype`` and ``checksum``"""
+        upload = self._get_upload(token)
+        if not upload:
+            raise UserError(_("This upload does not exist or has expired."))
+        asset = upload._finish()
+        return {
+            'id': asset.id,
+            'file_name': asset.file_name,
+            'file_mimetype': asset.file_mimetype,
+            'checksum': asset.checksum,
+        }
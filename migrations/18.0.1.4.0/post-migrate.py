@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+
+
+def migrate(cr, version):
+    # Backfill the content hash from the attachments ir.attachment already checksummed
+    cr.execute("""
+        UPDATE ds_asset a
+           SET checksum = att.checksum
+          FROM ir_attachment att
+         WHERE att.res_model = 'ds.asset'
+           AND att.res_field = 'file'
+           AND att.res_id = a.id
+           AND a.checksum IS NULL
+    """)
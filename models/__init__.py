@@ -1,4 +1,15 @@
 # -*- coding: utf-8 -*-
+from . import payload_cache
+from . import ir_attachment
 from . import asset
+from . import asset_upload
+from . import rendition
+from . import asset_duplicate
+from . import schedule
 from . import playlist
 from . import screen
+from . import screen_zone
+from . import play_event
+from . import telemetry
+from . import screen_health
+from . import calendar_event
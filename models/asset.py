@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 import base64
 import mimetypes
-from odoo import api, fields, models
+from collections import defaultdict
+
+from odoo import _, api, fields, models
+from odoo.tools import SQL
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Base64 characters decoded to sniff the type of an uploaded file (48 bytes)
+SNIFF_BASE64_LENGTH = 64
+
 
 class DsAsset(models.Model):
     _name = "ds.asset"
@@ -83,13 +89,34 @@ class DsAsset(models.Model):
         mime_type, _ = mimetypes.guess_type(filename)
         return mime_type
 
+    def _get_file_attachment(self):
+        """Return the ir.attachment backing the ``file`` field without loading its content"""
+        self.ensure_one()
+        return self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+
+    @api.model
+    def _read_file_head(self, attachment, size=32):
+        """Read the first bytes of an attachment (for MIME sniffing) without loading the whole file"""
+        try:
+            if attachment.store_fname:
+                with open(attachment._full_path(attachment.store_fname), 'rb') as f:
+                    return f.read(size)
+            return (attachment.db_datas or b'')[:size]
+        except OSError as e:
+            _logger.warning("Failed to read attachment %s: %s", attachment.id, e)
+            return b''
+
     @api.onchange('file')
     def _onchange_file(self):
         """Auto-detect file_mimetype when file is uploaded"""
         if self.file:
             try:
-                # Decode the file to analyze content
-                file_data = base64.b64decode(self.file)
+                # Only the first bytes are sniffed: decode just enough base64 for them
+                file_data = base64.b64decode(self.file[:SNIFF_BASE64_LENGTH])
                 
                 # Try to detect from content first (most reliable)
                 detected_mime = self._detect_mime_from_content(file_data)
@@ -105,7 +132,7 @@ class DsAsset(models.Model):
                 # Set the detected MIME type
                 if detected_mime:
                     self.file_mimetype = detected_mime
-                    _logger.info(f"Auto-detected MIME type '{detected_mime}' for asset")
+                    _logger.debug("Auto-detected MIME type '%s' for asset", detected_mime)
                 
                 # Auto-set asset type based on MIME type
                 if detected_mime:
@@ -115,23 +142,210 @@ class DsAsset(models.Model):
                         self.type = 'video'
                         
             except Exception as e:
-                _logger.warning(f"Failed to auto-detect MIME type: {e}")
+                _logger.warning("Failed to auto-detect MIME type: %s", e)
 
     file_mimetype = fields.Char(string="MIME Type")
     url = fields.Char(string="URL")
     qweb_key = fields.Char(string="QWeb XML ID", help="XML ID of a QWeb template to render for this slide (e.g., module.template_id)")
+    qweb_cache_ttl = fields.Integer(string="Render Cache (seconds)", default=60,
+                                    help="How long the rendered template is reused before rendering it again. 0 renders it every time the slide is shown.")
+    qweb_share_render = fields.Boolean(string="Share Render Across Screens", default=False,
+                                       help="Render the template once per playlist instead of once per screen. Only enable it for templates that do not use the screen.")
     duration = fields.Integer(string="Duration (seconds)", default=10, help="Default time to show this asset if not a video with natural length")
     cache_content = fields.Boolean(string="Cache Content", default=True,
                                     help="For webpages and calendars: cache the iframe and reuse it when cycling. Disable for dynamic content like weather or live data.")
     active = fields.Boolean(default=True)
+    checksum = fields.Char(string="Content Hash", readonly=True, copy=False, index=True,
+                           help="SHA1 of the uploaded file, used as ETag and as version of the content URL")
+    processing_state = fields.Selection([
+        ("none", "Not Needed"),
+        ("pending", "Pending"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ], string="Renditions", default="none", readonly=True, copy=False,
+        help="Resized images and web-optimized videos are generated in the background after upload")
+    rendition_ids = fields.One2many("ds.asset.rendition", "asset_id", string="Renditions", readonly=True)
 
     _sql_constraints = [
         ("name_not_empty", "CHECK(name <> '')", "Name must not be empty."),
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        assets = super().create(vals_list)
+        uploaded = assets.browse([asset.id for asset, vals in zip(assets, vals_list) if vals.get('file')])
+        uploaded._update_checksum()
+        uploaded._queue_renditions()
+        return assets
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'file' in vals:
+            self._update_checksum()
+            self._queue_renditions()
+        self._bump_dependent_payloads()
+        return res
+
+    def unlink(self):
+        self._bump_dependent_payloads()
+        # Through the ORM, so that their attachments go too
+        self.rendition_ids.sudo().unlink()
+        return super().unlink()
+
+    def _bump_dependent_payloads(self):
+        """Invalidate the cached payloads of the playlists and screens showing these assets"""
+        self.env['ds.playlist.item'].sudo().search([('asset_id', 'in', self.ids)]).playlist_id._bump_payload_version()
+        self.env['ds.screen'].sudo().search([('preloader_asset_id', 'in', self.ids)])._bump_payload_version()
+
+    def _update_checksum(self):
+        """Copy the SHA1 computed by ir.attachment at upload, so the file never has to be read again"""
+        if not self:
+            return
+        attachments = self.env['ir.attachment'].sudo().search_read([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'file'),
+            ('res_id', 'in', self.ids),
+        ], ['res_id', 'checksum'])
+        checksums = {a['res_id']: a['checksum'] for a in attachments}
+        for asset in self:
+            asset.checksum = checksums.get(asset.id) or False
+
+    def _queue_renditions(self):
+        """Drop the renditions of the previous file and let the cron generate new ones"""
+        if not self:
+            return
+        self.rendition_ids.sudo().unlink()
+        # The checksum tells a file is there without reading it (it runs right after _update_checksum)
+        with_media = self.filtered(lambda a: a.checksum and a.type in ('image', 'video'))
+        with_media.processing_state = 'pending'
+        (self - with_media).processing_state = 'none'
+        if with_media:
+            self.env.ref('ds_signage.ir_cron_asset_renditions')._trigger()
+
+    def _set_file_from_path(self, path, file_name=None, mimetype=None):
+        """Make the file at ``path`` (consumed) the content of this asset, without loading it in memory.
+
+        The previous file attachment is replaced, and the asset's type follows
+        the detected MIME type like an upload through the form does.
+        """
+        self.ensure_one()
+        self.check_access('write')
+        self._get_file_attachment().unlink()
+        self.env['ir.attachment'].sudo()._create_from_file_path(path, {
+            'name': file_name or self.name,
+            'res_model': self._name,
+            'res_field': 'file',
+            'res_id': self.id,
+            'mimetype': mimetype or 'application/octet-stream',
+        })
+        self.invalidate_recordset(['file'])
+        vals = {'file_name': file_name or self.file_name, 'file_mimetype': mimetype or self.file_mimetype}
+        if mimetype and mimetype.startswith('image/'):
+            vals['type'] = 'image'
+        elif mimetype and mimetype.startswith('video/'):
+            vals['type'] = 'video'
+        # Not through ``file``: the checksum and renditions are refreshed here
+        self.write(vals)
+        self._update_checksum()
+        self._queue_renditions()
+
+    def _get_content_version(self):
+        """Version token for the content URL: the content hash, or the write date for legacy rows"""
+        self.ensure_one()
+        if self.checksum:
+            # Renditions change what the URL serves: make sure caches that keep
+            # the version forever fetch it again once they are ready
+            return self.checksum[:16] + ('p' if self.processing_state == 'pending' else '')
+        ver_dt = self.write_date or self.create_date
+        return ver_dt.strftime('%Y%m%d%H%M%S') if ver_dt else '0'
+
+    def _get_content_url(self):
+        """Versioned URL of the uploaded file; safe to cache forever since it changes with the content.
+
+        Hashed files are served by content hash, so assets holding the same
+        bytes share one URL and one entry in every cache down the line.
+        """
+        self.ensure_one()
+        if self.checksum:
+            return f"/ds/c/{self.checksum}" + ("?p=1" if self.processing_state == 'pending' else "")
+        return f"/ds/a/{self.id}/content?v={self._get_content_version()}"
+
+    def _merge_duplicates(self):
+        """Merge the assets of ``self`` that hold the same file into the oldest of them.
+
+        Playlist items, screen preloaders, proof-of-play data and player
+        telemetry move to the kept asset, then the duplicates are deleted along with their
+        attachments and renditions. The file itself is stored once by the
+        filestore whatever the number of copies. Returns the kept assets.
+        """
+        groups = defaultdict(list)
+        for asset in self.filtered('checksum').sorted('id'):
+            groups[asset.checksum].append(asset)
+        mapping = {dup.id: keep.id for keep, *dups in groups.values() for dup in dups}
+        kept = self.browse({keep.id for keep, *_dups in groups.values()})
+        if not mapping:
+            return kept
+        duplicates = self.browse(list(mapping))
+
+        for keep in kept:
+            dups = duplicates.filtered(lambda a: mapping[a.id] == keep.id)
+            self.env['ds.playlist.item'].sudo().search([('asset_id', 'in', dups.ids)]).asset_id = keep
+            self.env['ds.screen'].sudo().with_context(active_test=False).search([
+                ('preloader_asset_id', 'in', dups.ids),
+            ]).preloader_asset_id = keep
+
+        # Proof of play and telemetry can be large: moved in SQL, summing hourly statistics that collide
+        self.env['ds.play.event'].flush_model()
+        self.env['ds.play.stat'].flush_model()
+        self.env['ds.player.telemetry'].flush_model()
+        values = SQL(", ").join(SQL("(%s, %s)", dup, keep) for dup, keep in mapping.items())
+        self.env.cr.execute(SQL("""
+            UPDATE ds_play_event e SET asset_id = m.keep
+              FROM (VALUES %s) AS m(dup, keep)
+             WHERE e.asset_id = m.dup
+        """, values))
+        # Their asset_id cascades: left in place, the duplicates' rows would go with them
+        self.env.cr.execute(SQL("""
+            UPDATE ds_player_telemetry t SET asset_id = m.keep
+              FROM (VALUES %s) AS m(dup, keep)
+             WHERE t.asset_id = m.dup
+        """, values))
+        self.env.cr.execute(SQL("""
+            INSERT INTO ds_play_stat (screen_id, asset_id, hour, play_count, error_count, total_duration)
+                 SELECT s.screen_id, m.keep, s.hour, sum(s.play_count), sum(s.error_count), sum(s.total_duration)
+                   FROM ds_play_stat s
+                   JOIN (VALUES %s) AS m(dup, keep) ON s.asset_id = m.dup
+               GROUP BY s.screen_id, m.keep, s.hour
+            ON CONFLICT (screen_id, asset_id, hour) DO UPDATE
+                    SET play_count = ds_play_stat.play_count + EXCLUDED.play_count,
+                        error_count = ds_play_stat.error_count + EXCLUDED.error_count,
+                        total_duration = ds_play_stat.total_duration + EXCLUDED.total_duration
+        """, values))
+        self.env['ds.play.event'].invalidate_model(['asset_id'])
+        self.env['ds.play.stat'].invalidate_model()
+        self.env['ds.player.telemetry'].invalidate_model(['asset_id'])
+
+        _logger.info("Merged %s duplicate assets into %s", len(duplicates), kept.ids)
+        duplicates.unlink()
+        return kept
+
+    def action_merge_duplicates(self):
+        kept = self._merge_duplicates()
+        merged = len(self.filtered('checksum')) - len(kept)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _("%s duplicate assets merged.", merged),
+                'type': 'success',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
     @api.constrains("type", "file", "url", "qweb_key")
     def _check_required_per_type(self):
-        for rec in self:
+        # bin_size: only tell whether a file is there, never load it (it may weigh gigabytes)
+        for rec in self.with_context(bin_size=True):
             if rec.type in ("image", "video") and not rec.file:
                 # Keep minimal, just warn in logs to avoid blocking early setup.
                 _logger.debug("Asset %s of type %s has no file set.", rec.name, rec.type)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, tools
+
+
+class DsAssetDuplicate(models.Model):
+    """Report of the files uploaded into several assets.
+
+    The filestore already keeps identical bytes once (files are named after
+    their SHA1), so merging reclaims no file storage: it removes the
+    duplicate references, i.e. the extra assets, their attachment rows and
+    their renditions.
+    """
+    _name = "ds.asset.duplicate"
+    _description = "Digital Signage Duplicate Assets"
+    _auto = False
+    _order = "duplicate_count desc, file_size desc"
+
+    checksum = fields.Char(string="Content Hash", readonly=True)
+    asset_id = fields.Many2one("ds.asset", string="Kept Asset", readonly=True,
+                               help="Oldest asset with this content; merging keeps it")
+    asset_count = fields.Integer(string="Copies", readonly=True)
+    file_size = fields.Integer(string="File Size", readonly=True, help="Stored once in the filestore, whatever the number of copies")
+    duplicate_count = fields.Integer(string="Duplicate References", readonly=True, aggregator="sum",
+                                     help="Assets merging removes: all copies but the kept one")
+    asset_ids = fields.One2many("ds.asset", compute="_compute_asset_ids", string="Assets")
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT min(a.id) AS id,
+                       min(a.id) AS asset_id,
+                       a.checksum,
+                       count(*) AS asset_count,
+                       max(att.file_size) AS file_size,
+                       count(*) - 1 AS duplicate_count
+                  FROM ds_asset a
+             LEFT JOIN ir_attachment att
+                    ON att.res_model = 'ds.asset' AND att.res_field = 'file' AND att.res_id = a.id
+                 WHERE a.checksum IS NOT NULL
+              GROUP BY a.checksum
+                HAVING count(*) > 1
+            )
+        """)
+
+    def _get_assets(self):
+        return self.env['ds.asset'].with_context(active_test=False).search([('checksum', 'in', self.mapped('checksum'))])
+
+    def _compute_asset_ids(self):
+        assets = self._get_assets()
+        for rec in self:
+            rec.asset_ids = assets.filtered(lambda a: a.checksum == rec.checksum)
+
+    def action_merge(self):
+        return self._get_assets().action_merge_duplicates()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import uuid
+from datetime import timedelta
+
+from psycopg2.errors import LockNotAvailable
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+_logger = logging.getLogger(__name__)
+
+# Largest chunk accepted by one request, in bytes
+UPLOAD_MAX_CHUNK = 16 * 1024 * 1024
+# Chunk size suggested to clients
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Bytes copied from the request to the file at a time
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+# Hours an unfinished upload is kept after its last chunk, before its partial file is deleted
+UPLOAD_EXPIRY_HOURS = 24
+
+
+class DsAssetUpload(models.Model):
+    """A file being uploaded into an asset in chunks.
+
+    Chunks are appended to a partial file next to the filestore, so the
+    request body streams to disk and memory stays flat whatever the size of
+    the file. The bytes received so far are the size of that file, which
+    lets an interrupted upload resume where it stopped. Finishing moves the
+    file into the filestore as the asset's ``file``.
+    """
+    _name = "ds.asset.upload"
+    _description = "Digital Signage Asset Upload"
+
+    token = fields.Char(required=True, default=lambda self: str(uuid.uuid4()), copy=False, index=True, readonly=True)
+    asset_id = fields.Many2one("ds.asset", required=True, ondelete="cascade", readonly=True)
+    file_name = fields.Char(readonly=True)
+    mimetype = fields.Char(readonly=True, help="Detected from the first bytes of the file")
+
+    _sql_constraints = [
+        ("token_unique", "unique(token)", "Upload token must be unique."),
+    ]
+
+    def unlink(self):
+        for upload in self:
+            try:
+                os.unlink(upload._get_path())
+            except FileNotFoundError:
+                pass
+        return super().unlink()
+
+    def _get_path(self):
+        self.ensure_one()
+        return os.path.join(self.env['ir.attachment']._filestore(), 'ds_uploads', self.token)
+
+    def _get_received(self):
+        """Bytes received so far"""
+        try:
+            return os.path.getsize(self._get_path())
+        except FileNotFoundError:
+            return 0
+
+    def _get_status(self):
+        self.ensure_one()
+        return {
+            'token': self.token,
+            'asset_id': self.asset_id.id,
+            'received': self._get_received(),
+            'chunk_size': UPLOAD_CHUNK_SIZE,
+        }
+
+    def _append(self, offset, stream, length):
+        """Append ``length`` bytes read from ``stream`` at ``offset``; return the bytes received.
+
+        The offset must be the current end of the file: a client that lost
+        track asks for the status and resumes from there. The upload row is
+        locked until the transaction ends, so a chunk retried while the first
+        attempt is still being written is refused instead of appended twice.
+        """
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(SQL(
+                    "SELECT id FROM ds_asset_upload WHERE id = %s FOR UPDATE NOWAIT", self.id,
+                ))
+        except LockNotAvailable:
+            raise UserError(_("Another chunk of this upload is being written."))
+        received = self._get_received()
+        if offset != received:
+            raise UserError(_("Upload out of sync: %(received)s bytes received, chunk sent at %(offset)s.",
+                              received=received, offset=offset))
+        path = self._get_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        head = None
+        with open(path, 'ab') as f:
+            remaining = length
+            while remaining > 0:
+                block = stream.read(min(UPLOAD_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                if head is None:
+                    head = block
+                f.write(block)
+                remaining -= len(block)
+        # Sniff the type from the first chunk only, never from the whole file
+        if offset == 0 and head:
+            self.mimetype = (
+                self.env['ds.asset']._detect_mime_from_content(head)
+                or self.env['ds.asset']._detect_mime_from_filename(self.file_name)
+                or False
+            )
+        return self._get_received()
+
+    def _finish(self):
+        """Attach the uploaded file to the asset and close the upload"""
+        self.ensure_one()
+        path = self._get_path()
+        if not os.path.exists(path):
+            raise UserError(_("Nothing was uploaded."))
+        asset = self.asset_id
+        asset._set_file_from_path(path, self.file_name, self.mimetype)
+        self.unlink()
+        return asset
+
+    @api.autovacuum
+    def _gc_uploads(self):
+        """Drop the uploads left unfinished, and their partial files"""
+        deadline = fields.Datetime.now() - timedelta(hours=UPLOAD_EXPIRY_HOURS)
+        # Chunks do not write the record: the partial file tells when the last one came
+        expired = self.search([('create_date', '<', deadline)]).filtered(
+            lambda upload: not os.path.exists(upload._get_path())
+            or os.path.getmtime(upload._get_path()) < deadline.timestamp()
+        )
+        if expired:
+            _logger.info("Removing %s expired asset uploads", len(expired))
+            expired.unlink()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class CalendarEvent(models.Model):
+    _inherit = "calendar.event"
+
+    def init(self):
+        super().init()
+        # Version of the events shown by calendar slides: a sequence, so bumping
+        # it never locks a row, and every worker can read it in one cheap query
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS ds_signage_calendar_version")
+
+    @api.model
+    def _ds_get_signage_version(self):
+        self.env.cr.execute("SELECT last_value FROM ds_signage_calendar_version")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _ds_bump_signage_version(self):
+        """Invalidate the events cached for calendar slides in every worker, once the transaction commits.
+
+        Bumped any sooner, a concurrent request could cache the old events
+        under the new version and serve them until the cache expires.
+        """
+        if self.env.cr.postcommit.data.get('ds_signage.calendar_bump'):
+            return
+        self.env.cr.postcommit.data['ds_signage.calendar_bump'] = True
+        registry = self.env.registry
+
+        @self.env.cr.postcommit.add
+        def bump():
+            # The committed cursor is done with: the sequence does not care which one bumps it
+            with registry.cursor() as cr:
+                cr.execute("SELECT nextval('ds_signage_calendar_version')")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        events = super().create(vals_list)
+        self._ds_bump_signage_version()
+        return events
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._ds_bump_signage_version()
+        return res
+
+    def unlink(self):
+        self._ds_bump_signage_version()
+        return super().unlink()
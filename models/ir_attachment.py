@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import shutil
+
+from odoo import api, models
+from odoo.tools import SQL
+
+# Bytes read at a time when hashing a file
+CHUNK_SIZE = 1024 * 1024
+
+
+class IrAttachment(models.Model):
+    _inherit = "ir.attachment"
+
+    @api.model
+    def _create_from_file_path(self, path, vals):
+        """Create an attachment whose content is the file at ``path``, moved into the filestore.
+
+        Unlike ``raw``/``datas``, the content is never loaded in memory: it is
+        hashed in chunks and the file is moved (or copied) to its checksum
+        location. ``path`` is consumed. A file new to the filestore is marked
+        for garbage collection, so a rollback does not leave it behind. With
+        database storage the content has to go through memory anyway.
+        """
+        if self._storage() != 'file':
+            with open(path, 'rb') as f:
+                raw = f.read()
+            os.unlink(path)
+            return self.create(dict(vals, raw=raw))
+
+        sha = hashlib.sha1()
+        size = 0
+        with open(path, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                sha.update(chunk)
+                size += len(chunk)
+        checksum = sha.hexdigest()
+        fname = f"{checksum[:2]}/{checksum}"
+        full_path = self._full_path(fname)
+        if os.path.exists(full_path):
+            # Same content already stored: share the file
+            os.unlink(path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            shutil.move(path, full_path)
+            # Like _file_write: if the transaction aborts, the filestore GC removes the file
+            self._mark_for_gc(fname)
+        attachment = self.create(vals)
+        # create() and write() ignore these columns (they are normally derived from the content)
+        self.env.cr.execute(SQL(
+            "UPDATE ir_attachment SET store_fname = %s, checksum = %s, file_size = %s WHERE id = %s",
+            fname, checksum, size, attachment.id,
+        ))
+        attachment.invalidate_recordset(['store_fname', 'checksum', 'file_size'])
+        return attachment
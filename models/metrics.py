@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import wraps
+
+from .payload_cache import calendar_cache, payload_cache, render_cache, schedule_cache
+
+# Share of requests whose duration is observed; counters and bytes cover every request
+METRICS_SAMPLE_RATE = 0.1
+# Upper bounds (seconds) of the duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Type and help text of each exported metric
+METRICS = {
+    'ds_signage_requests_total': ('counter', "Requests answered by the signage routes"),
+    'ds_signage_response_bytes_total': ('counter', "Bytes of response bodies sent by the signage routes (Content-Length)"),
+    'ds_signage_request_duration_seconds': ('histogram', "Duration of a sample of the signage requests"),
+    'ds_signage_content_responses_total': ('counter', "Asset content responses, by kind: full, range (206) or not_modified (304)"),
+    'ds_signage_qweb_render_seconds': ('histogram', "Duration of QWeb slide renders (cache misses)"),
+    'ds_signage_cache_hits_total': ('counter', "Hits of the worker caches"),
+    'ds_signage_cache_misses_total': ('counter', "Misses of the worker caches"),
+    'ds_signage_cache_hit_ratio': ('gauge', "Share of the lookups of the worker caches that hit"),
+    'ds_signage_cache_entries': ('gauge', "Entries held by the worker caches"),
+}
+
+_CACHES = {
+    'payload': payload_cache,
+    'render': render_cache,
+    'schedule': schedule_cache,
+    'calendar': calendar_cache,
+}
+
+
+class _Histogram:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = bisect_left(DURATION_BUCKETS, value)
+        if i < len(self.buckets):
+            self.buckets[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Request metrics of a worker, aggregated in memory and exported in the Prometheus text format.
+
+    Recording is a dict update under a lock: no I/O on the request path.
+    Each worker process holds its own figures since the process started.
+    """
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = defaultdict(_Histogram)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._histograms[key].observe(value)
+
+    def sampled(self):
+        return random.random() < self.sample_rate
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _cache_samples(self):
+        for cache_name, cache in _CACHES.items():
+            labels = (('cache', cache_name),)
+            stats = cache.stats()
+            lookups = stats['hits'] + stats['misses']
+            yield 'ds_signage_cache_hits_total', labels, stats['hits']
+            yield 'ds_signage_cache_misses_total', labels, stats['misses']
+            yield 'ds_signage_cache_hit_ratio', labels, stats['hits'] / lookups if lookups else 0.0
+            yield 'ds_signage_cache_entries', labels, stats['size']
+
+    def export(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            samples = defaultdict(list)
+            for (name, labels), value in self._counters.items():
+                samples[name].append((labels, value))
+            histograms = defaultdict(list)
+            for (name, labels), histogram in self._histograms.items():
+                histograms[name].append((labels, list(histogram.buckets), histogram.sum, histogram.count))
+        for name, labels, value in self._cache_samples():
+            samples[name].append((labels, value))
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            if name not in samples and name not in histograms:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in sorted(samples.get(name, ())):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for labels, buckets, total, count in sorted(histograms.get(name, ())):
+                cumulative = 0
+                for bound, bucket in zip(DURATION_BUCKETS, buckets):
+                    cumulative += bucket
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics(METRICS_SAMPLE_RATE)
+
+
+def instrument(route):
+    """Count the requests of a controller method and the bytes it returns, and time a sample of them.
+
+    Lazy QWeb responses are rendered here, so that the sampled duration and
+    the byte count include the template.
+    """
+    def decorator(endpoint):
+        @wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter() if metrics.sampled() else None
+            try:
+                response = endpoint(*args, **kwargs)
+            except Exception as e:
+                metrics.inc('ds_signage_requests_total', route=route, status=str(getattr(e, 'code', 500)))
+                raise
+            if getattr(response, 'is_qweb', False):
+                response.flatten()
+            # request.not_found() and friends return werkzeug exceptions, which carry a ``code``
+            status = getattr(response, 'status_code', None) or getattr(response, 'code', 200)
+            metrics.inc('ds_signage_requests_total', route=route, status=str(status))
+            length = getattr(response, 'content_length', None)
+            if length is None and getattr(response, 'is_sequence', False):
+                # Rendered in memory (e.g. the template above): the body is at hand
+                length = len(response.get_data())
+            if length:
+                metrics.inc('ds_signage_response_bytes_total', length, route=route)
+            if start is not None:
+                metrics.observe('ds_signage_request_duration_seconds', time.perf_counter() - start, route=route)
+            return response
+        return wrapper
+    return decorator
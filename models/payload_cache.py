@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from odoo import fields, models
+from odoo.tools import SQL
+from odoo.tools.lru import LRU
+
+# Number of compiled payloads (screens + playlists) each worker keeps
+PAYLOAD_CACHE_SIZE = 512
+# Number of rendered QWeb slides each worker keeps
+RENDER_CACHE_SIZE = 256
+# Number of screen schedule indexes each worker keeps
+SCHEDULE_CACHE_SIZE = 512
+# Number of daily calendar event lists each worker keeps (one per database and version)
+CALENDAR_CACHE_SIZE = 16
+
+
+class _LruCache:
+    """Bounded LRU shared by the threads of a worker, counting hits and misses"""
+
+    def __init__(self, size):
+        self._entries = LRU(size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class PayloadCache(_LruCache):
+    """Compiled player payloads, validated against payload versions.
+
+    Entries are stored with the payload version they were built from. Writes
+    bump the version in the database, so every worker notices a stale entry
+    on its next lookup, without any cross-process signalling.
+    """
+
+    def get(self, key, version):
+        entry = self._entries.get(key)
+        hit = entry is not None and entry[0] == version
+        self._count(hit)
+        return entry[1] if hit else None
+
+    def set(self, key, version, payload):
+        self._entries[key] = (version, payload)
+
+
+class TimedCache(_LruCache):
+    """Values that expire after a per-entry time to live (e.g. rendered QWeb slides)"""
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        hit = entry is not None and entry[0] > time.monotonic()
+        self._count(hit)
+        return entry[1] if hit else None
+
+    def set(self, key, value, ttl):
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+
+payload_cache = PayloadCache(PAYLOAD_CACHE_SIZE)
+render_cache = TimedCache(RENDER_CACHE_SIZE)
+schedule_cache = PayloadCache(SCHEDULE_CACHE_SIZE)
+calendar_cache = TimedCache(CALENDAR_CACHE_SIZE)
+
+
+class DsPayloadMixin(models.AbstractModel):
+    _name = "ds.payload.mixin"
+    _description = "Digital Signage Cached Payload Version"
+
+    payload_version = fields.Integer(readonly=True, copy=False, default=0,
+                                     help="Incremented whenever something the player shows changes; invalidates the cached payloads in every worker")
+
+    def _bump_payload_version(self):
+        """Invalidate the cached payloads built from these records"""
+        if not self:
+            return
+        # Plain SQL: no write() recursion and one UPDATE for the whole recordset
+        self.env.cr.execute(SQL(
+            "UPDATE %s SET payload_version = payload_version + 1 WHERE id IN %s",
+            SQL.identifier(self._table), tuple(self.ids),
+        ))
+        self.invalidate_recordset(['payload_version'])
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import logging
+from datetime import datetime, timedelta, timezone
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+# Largest batch accepted from one player upload
+MAX_EVENTS_PER_BATCH = 1000
+
+
+class DsPlayEvent(models.Model):
+    _name = "ds.play.event"
+    _description = "Digital Signage Play Event"
+    _order = "started_at desc, id desc"
+    # High-volume raw rows: skip create/write user and date columns
+    _log_access = False
+
+    screen_id = fields.Many2one("ds.screen", required=True, ondelete="cascade", index=True)
+    asset_id = fields.Many2one("ds.asset", required=True, ondelete="cascade")
+    event_type = fields.Selection([
+        ("play", "Played"),
+        ("error", "Error"),
+    ], required=True, default="play")
+    started_at = fields.Datetime(required=True)
+    duration = fields.Float(string="Duration (seconds)")
+    message = fields.Char()
+    rolled_up = fields.Boolean(default=False, help="Already counted in the hourly statistics")
+
+    def init(self):
+        # The rollup only ever looks for the few rows not counted yet
+        create_index(self.env.cr, "ds_play_event_pending_rollup_idx", self._table, ["id"], where="NOT rolled_up")
+
+    @api.model
+    def _ingest(self, screen, events):
+        """Store a batch of player events in one INSERT.
+
+        ``events`` are the compact dicts buffered by player.js: ``a`` asset id,
+        ``t`` start time (epoch milliseconds), ``d`` seconds shown and ``e``
+        an error message for failures. Malformed or unknown entries are
+        dropped rather than failing the whole batch.
+        """
+        events = [e for e in events[:MAX_EVENTS_PER_BATCH] if isinstance(e, dict)]
+        asset_ids = {e['a'] for e in events if isinstance(e.get('a'), int) and not isinstance(e['a'], bool)}
+        known_assets = set(self.env['ds.asset'].sudo().browse(asset_ids).exists().ids)
+        now = fields.Datetime.now()
+        vals_list = []
+        for event in events:
+            try:
+                started_at = datetime.fromtimestamp(float(event['t']) / 1000.0, tz=timezone.utc).replace(tzinfo=None)
+                duration = min(max(float(event.get('d') or 0), 0.0), 86400.0)
+            except (KeyError, TypeError, ValueError, OverflowError):
+                continue
+            # Checked first: a list or dict would not even hash for the lookup below
+            if not isinstance(event.get('a'), int) or isinstance(event['a'], bool):
+                continue
+            if event['a'] not in known_assets or not (now - timedelta(days=30) < started_at < now + timedelta(days=1)):
+                continue
+            error = event.get('e')
+            vals_list.append({
+                'screen_id': screen.id,
+                'asset_id': event['a'],
+                'event_type': 'error' if error else 'play',
+                'started_at': started_at,
+                'duration': duration,
+                'message': str(error)[:200] if error else False,
+            })
+        return self.sudo().create(vals_list)
+
+    @api.model
+    def _cron_rollup(self, retention_days=30):
+        """Count new raw events into hourly statistics, then prune old raw events.
+
+        Marking and counting happen in one statement, so events inserted
+        meanwhile are simply picked up by the next run.
+        """
+        self.env.flush_all()
+        self.env.cr.execute(SQL("""
+            WITH batch AS (
+                UPDATE ds_play_event
+                   SET rolled_up = TRUE
+                 WHERE NOT rolled_up
+             RETURNING screen_id, asset_id, event_type, started_at, duration
+            )
+            INSERT INTO ds_play_stat (screen_id, asset_id, hour, play_count, error_count, total_duration)
+                 SELECT screen_id, asset_id, date_trunc('hour', started_at),
+                        count(*) FILTER (WHERE event_type = 'play'),
+                        count(*) FILTER (WHERE event_type = 'error'),
+                        COALESCE(sum(duration) FILTER (WHERE event_type = 'play'), 0)
+                   FROM batch
+               GROUP BY screen_id, asset_id, date_trunc('hour', started_at)
+            ON CONFLICT (screen_id, asset_id, hour) DO UPDATE
+                    SET play_count = ds_play_stat.play_count + EXCLUDED.play_count,
+                        error_count = ds_play_stat.error_count + EXCLUDED.error_count,
+                        total_duration = ds_play_stat.total_duration + EXCLUDED.total_duration
+        """))
+        _logger.info("Rolled up play events into %s hourly statistics", self.env.cr.rowcount)
+        self.env.cr.execute(SQL(
+            "DELETE FROM ds_play_event WHERE rolled_up AND started_at < %s",
+            fields.Datetime.now() - timedelta(days=retention_days),
+        ))
+        self.env.invalidate_all()
+
+
+class DsPlayStat(models.Model):
+    _name = "ds.play.stat"
+    _description = "Digital Signage Hourly Play Statistics"
+    _order = "hour desc, screen_id, asset_id"
+    _log_access = False
+
+    screen_id = fields.Many2one("ds.screen", required=True, ondelete="cascade", index=True, readonly=True)
+    asset_id = fields.Many2one("ds.asset", required=True, ondelete="cascade", index=True, readonly=True)
+    hour = fields.Datetime(required=True, readonly=True)
+    play_count = fields.Integer(string="Plays", readonly=True, aggregator="sum")
+    error_count = fields.Integer(string="Errors", readonly=True, aggregator="sum")
+    total_duration = fields.Float(string="Time on Screen (s)", readonly=True, aggregator="sum")
+
+    _sql_constraints = [
+        ("screen_asset_hour_uniq", "unique(screen_id, asset_id, hour)", "Only one statistic per screen, asset and hour."),
+    ]
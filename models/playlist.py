@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class DsPlaylist(models.Model):
     _name = "ds.playlist"
+    _inherit = ["ds.payload.mixin"]
     _description = "Digital Signage Playlist"
     _order = "name, id"
 
@@ -12,9 +13,31 @@ class DsPlaylist(models.Model):
     active = fields.Boolean(default=True)
     auto_unmute = fields.Boolean(string="Auto Unmute Audio", default=False, help="Automatically unmute audio for videos, YouTube, and other media with sound")
 
+    def write(self, vals):
+        res = super().write(vals)
+        self._bump_payload_version()
+        return res
+
+    def _bump_payload_version(self):
+        super()._bump_payload_version()
+        # Screens showing these playlists, by default, in a time slot or in a zone
+        self.env['ds.screen'].sudo().search([
+            '|', '|', ('playlist_id', 'in', self.ids), ('schedule_ids.playlist_id', 'in', self.ids),
+            ('zone_ids.playlist_id', 'in', self.ids),
+        ])._notify_players()
+
+    def unlink(self):
+        # Screens lose their playlist, time slots and zone playlists through the database (set null, cascade)
+        self.env['ds.screen'].sudo().search([
+            '|', '|', ('playlist_id', 'in', self.ids), ('schedule_ids.playlist_id', 'in', self.ids),
+            ('zone_ids.playlist_id', 'in', self.ids),
+        ])._bump_payload_version()
+        return super().unlink()
+
 
 class DsPlaylistItem(models.Model):
     _name = "ds.playlist.item"
+    _inherit = ["ds.schedule.mixin"]
     _description = "Digital Signage Playlist Item"
     _order = "sequence, id"
 
@@ -24,3 +47,19 @@ class DsPlaylistItem(models.Model):
 
     asset_id = fields.Many2one("ds.asset", required=True, ondelete="restrict")
     duration_override = fields.Integer(string="Duration Override (s)")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        items = super().create(vals_list)
+        items.playlist_id._bump_payload_version()
+        return items
+
+    def write(self, vals):
+        playlists = self.playlist_id
+        res = super().write(vals)
+        (playlists | self.playlist_id)._bump_payload_version()
+        return res
+
+    def unlink(self):
+        self.playlist_id._bump_payload_version()
+        return super().unlink()
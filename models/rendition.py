@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from PIL import Image, ImageOps
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Target widths of image renditions (never upscaled past the original)
+IMAGE_WIDTHS = (640, 1280, 1920, 3840)
+# (Pillow format, MIME type, quality) of each image rendition
+IMAGE_FORMATS = (
+    ("WEBP", "image/webp", 80),
+    ("JPEG", "image/jpeg", 85),
+)
+# Videos are re-encoded to H.264/AAC MP4 with the index up front (faststart), at most this wide
+VIDEO_MAX_WIDTH = 1920
+VIDEO_TIMEOUT = 3 * 60 * 60
+# Assets processed per cron run; the cron triggers itself again while some are pending
+BATCH_SIZE = 5
+
+
+class DsAssetRendition(models.Model):
+    _name = "ds.asset.rendition"
+    _description = "Digital Signage Asset Rendition"
+    _order = "asset_id, width, id"
+
+    asset_id = fields.Many2one("ds.asset", required=True, ondelete="cascade", index=True)
+    width = fields.Integer(required=True)
+    mimetype = fields.Char(required=True)
+    attachment_id = fields.Many2one("ir.attachment", readonly=True, ondelete="set null")
+    file_size = fields.Integer(related="attachment_id.file_size")
+
+    def unlink(self):
+        attachments = self.attachment_id
+        res = super().unlink()
+        attachments.unlink()
+        return res
+
+    def _attach(self, path, filename):
+        """Store the file at ``path`` (consumed) as the content of this rendition"""
+        self.ensure_one()
+        self.attachment_id = self.env['ir.attachment'].sudo()._create_from_file_path(path, {
+            'name': filename,
+            'res_model': self._name,
+            'res_id': self.id,
+            'mimetype': self.mimetype,
+        })
+
+    @api.model
+    def _generate_image_renditions(self, asset, path):
+        with Image.open(path) as img:
+            if getattr(img, 'is_animated', False):
+                # Resizing would drop the animation
+                return
+            img = ImageOps.exif_transpose(img)
+            widths = sorted({min(width, img.width) for width in IMAGE_WIDTHS})
+            for width in widths:
+                height = max(round(img.height * width / img.width), 1)
+                resized = img.resize((width, height), Image.LANCZOS) if width != img.width else img
+                for fmt, mimetype, quality in IMAGE_FORMATS:
+                    frame = resized
+                    if fmt == 'JPEG' and frame.mode not in ('RGB', 'L'):
+                        frame = frame.convert('RGB')
+                    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                        frame.save(tmp, format=fmt, quality=quality, optimize=True)
+                    rendition = self.create({'asset_id': asset.id, 'width': width, 'mimetype': mimetype})
+                    rendition._attach(tmp.name, f"{asset.id}_{width}.{fmt.lower()}")
+
+    @api.model
+    def _generate_video_renditions(self, asset, path):
+        ffmpeg = shutil.which('ffmpeg')
+        if not ffmpeg:
+            _logger.info("ffmpeg not found, asset %s is served as uploaded", asset.id)
+            return
+        fd, output = tempfile.mkstemp(suffix='.mp4')
+        os.close(fd)
+        try:
+            subprocess.run([
+                ffmpeg, '-y', '-loglevel', 'error', '-i', path,
+                '-vf', f"scale='min({VIDEO_MAX_WIDTH},iw)':-2",
+                '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-pix_fmt', 'yuv420p',
+                '-c:a', 'aac', '-b:a', '128k',
+                '-movflags', '+faststart',
+                output,
+            ], check=True, capture_output=True, timeout=VIDEO_TIMEOUT)
+        except BaseException:
+            os.unlink(output)
+            raise
+        rendition = self.create({'asset_id': asset.id, 'width': VIDEO_MAX_WIDTH, 'mimetype': 'video/mp4'})
+        rendition._attach(output, f"{asset.id}.mp4")
+
+    @api.model
+    def _generate_renditions(self, asset):
+        """Replace the renditions of an asset from its current file"""
+        asset.rendition_ids.unlink()
+        attachment = asset._get_file_attachment()
+        if not attachment:
+            return
+        tmp_path = None
+        if attachment.store_fname:
+            path = attachment._full_path(attachment.store_fname)
+        else:
+            # Database storage: the tools below need a file
+            with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                tmp.write(attachment.raw)
+            path = tmp_path = tmp.name
+        try:
+            if asset.type == 'image':
+                self._generate_image_renditions(asset, path)
+            elif asset.type == 'video':
+                self._generate_video_renditions(asset, path)
+        finally:
+            if tmp_path:
+                os.unlink(tmp_path)
+
+    @api.model
+    def _cron_process_pending(self):
+        """Generate the renditions of freshly uploaded assets, one commit per asset"""
+        assets = self.env['ds.asset'].search([('processing_state', '=', 'pending')], limit=BATCH_SIZE + 1)
+        for asset in assets[:BATCH_SIZE]:
+            try:
+                self._generate_renditions(asset)
+                asset.processing_state = 'done'
+            except Exception:  # noqa: BLE001
+                _logger.exception("Failed to generate renditions of asset %s", asset.id)
+                self.env.cr.rollback()
+                asset.processing_state = 'failed'
+            self.env.cr.commit()
+        if len(assets) > BATCH_SIZE:
+            self.env.ref('ds_signage.ir_cron_asset_renditions')._trigger()
+
+    @api.model
+    def _pick(self, asset, width=None, accept_webp=False):
+        """Best rendition of ``asset`` for a viewport ``width`` (empty when the original should be served)"""
+        renditions = asset.rendition_ids.filtered('attachment_id')
+        if asset.type == 'video':
+            return renditions[:1]
+        if not width:
+            return self.browse()
+        mimetype = 'image/webp' if accept_webp else 'image/jpeg'
+        renditions = renditions.filtered(lambda r: r.mimetype == mimetype).sorted('width')
+        # Smallest rendition at least as wide as the viewport, else the widest one
+        return next((r for r in renditions if r.width >= width), renditions[-1:])
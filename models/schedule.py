@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+
+# Seconds of schedule resolved ahead by a screen's schedule index
+SCHEDULE_HORIZON = 7 * 24 * 3600
+# An index is rebuilt once less than this is left before its horizon, so that
+# the next transition is always known at least this far ahead
+SCHEDULE_MIN_LOOKAHEAD = 24 * 3600
+
+WEEKDAY_FIELDS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class ScheduleRule:
+    """Sorted, disjoint ``[start, end)`` intervals (epoch seconds) when a schedule applies"""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals):
+        merged = _merge_intervals(intervals)
+        self.starts = [start for start, _end in merged]
+        self.ends = [end for _start, end in merged]
+
+    def __contains__(self, ts):
+        i = bisect_right(self.starts, ts) - 1
+        return i >= 0 and ts < self.ends[i]
+
+    def boundaries(self):
+        return self.starts + self.ends
+
+
+class ScheduleIndex:
+    """What a screen plays between ``start`` and ``end``, resolved ahead of time.
+
+    ``times`` holds the (sorted) instants when the schedule changes and
+    ``states`` what plays from each of them on, so resolving an instant is a
+    bisection instead of evaluating every schedule rule on each request.
+    """
+
+    __slots__ = ("start", "end", "times", "states")
+
+    def __init__(self, start, end, times, states):
+        self.start = start
+        self.end = end
+        self.times = times
+        self.states = states
+
+    def covers(self, ts):
+        return self.start <= ts < self.end - SCHEDULE_MIN_LOOKAHEAD
+
+    def lookup(self, ts):
+        """Return ``(segment_start, state, next_transition)`` at ``ts``; ``next_transition`` is None past the horizon"""
+        i = bisect_right(self.times, ts) - 1
+        next_transition = self.times[i + 1] if i + 1 < len(self.times) else None
+        return self.times[i], self.states[i], next_transition
+
+
+class DsScheduleMixin(models.AbstractModel):
+    _name = "ds.schedule.mixin"
+    _description = "Digital Signage Time Window"
+
+    date_from = fields.Date(string="From Date")
+    date_to = fields.Date(string="To Date")
+    hour_from = fields.Float(string="From Hour", default=0.0)
+    hour_to = fields.Float(string="To Hour", default=24.0,
+                           help="A window ending before it starts runs overnight, into the next day")
+    mon = fields.Boolean(string="Mon", default=True)
+    tue = fields.Boolean(string="Tue", default=True)
+    wed = fields.Boolean(string="Wed", default=True)
+    thu = fields.Boolean(string="Thu", default=True)
+    fri = fields.Boolean(string="Fri", default=True)
+    sat = fields.Boolean(string="Sat", default=True)
+    sun = fields.Boolean(string="Sun", default=True)
+
+    @api.constrains("date_from", "date_to", "hour_from", "hour_to")
+    def _check_schedule_window(self):
+        for rec in self:
+            if rec.date_from and rec.date_to and rec.date_from > rec.date_to:
+                raise ValidationError(_("The end date of a time window cannot be before its start date."))
+            if not (0 <= rec.hour_from < 24 and 0 < rec.hour_to <= 24):
+                raise ValidationError(_("Hours of a time window must be between 00:00 and 24:00."))
+
+    def _is_scheduled(self):
+        """Whether this record is restricted to some time window at all"""
+        self.ensure_one()
+        return bool(
+            self.date_from or self.date_to
+            or self.hour_from or self.hour_to != 24
+            or not all(self[day] for day in WEEKDAY_FIELDS)
+        )
+
+    def _get_schedule_rule(self, start, end, tz):
+        """Build the :class:`ScheduleRule` of this window between the epochs ``start`` and ``end``"""
+        self.ensure_one()
+        local_start = datetime.fromtimestamp(start, tz).date()
+        local_end = datetime.fromtimestamp(end, tz).date()
+        intervals = []
+        # The day before may hold an overnight window still running at ``start``
+        day = local_start - timedelta(days=1)
+        while day <= local_end:
+            if (self[WEEKDAY_FIELDS[day.weekday()]]
+                    and (not self.date_from or day >= self.date_from)
+                    and (not self.date_to or day <= self.date_to)):
+                midnight = datetime.combine(day, time())
+                window_start = midnight + timedelta(hours=self.hour_from)
+                window_end = midnight + timedelta(hours=self.hour_to)
+                if window_end <= window_start:
+                    window_end += timedelta(days=1)
+                window_start = tz.localize(window_start).timestamp()
+                window_end = tz.localize(window_end).timestamp()
+                if window_end > start and window_start < end:
+                    intervals.append((max(window_start, start), min(window_end, end)))
+            day += timedelta(days=1)
+        return ScheduleRule(intervals)
+
+
+class DsScreenSchedule(models.Model):
+    _name = "ds.screen.schedule"
+    _inherit = ["ds.schedule.mixin"]
+    _description = "Digital Signage Screen Schedule"
+    _order = "screen_id, sequence, id"
+
+    sequence = fields.Integer(default=10, help="When time slots overlap, the first one wins")
+    screen_id = fields.Many2one("ds.screen", required=True, ondelete="cascade", index=True)
+    playlist_id = fields.Many2one("ds.playlist", required=True, ondelete="cascade")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        schedules = super().create(vals_list)
+        schedules.screen_id._bump_payload_version()
+        return schedules
+
+    def write(self, vals):
+        screens = self.screen_id
+        res = super().write(vals)
+        (screens | self.screen_id)._bump_payload_version()
+        return res
+
+    def unlink(self):
+        self.screen_id._bump_payload_version()
+        return super().unlink()
+
@@ -1,15 +1,106 @@
 # -*- coding: utf-8 -*-
+import atexit
+import logging
+import threading
+import time
 import uuid
-from odoo import api, fields, models
+from collections import defaultdict
+
+import pytz
+
+from odoo import SUPERUSER_ID, _, api, fields, models
+from odoo.addons.base.models.res_partner import _tz_get
+from odoo.exceptions import UserError
+from odoo.modules.registry import Registry
+from odoo.tools import SQL
+
+from .schedule import SCHEDULE_HORIZON, ScheduleIndex
+
+_logger = logging.getLogger(__name__)
+
+# Seconds between two bulk writes of the heartbeats buffered by a worker
+HEARTBEAT_FLUSH_INTERVAL = 30
+# Type of the bus notification telling a player that its manifest changed
+BUS_NOTIFICATION_TYPE = "ds_signage/revision"
+# Fields fleet operations may set on many screens at once
+BULK_ASSIGN_FIELDS = ("playlist_id", "preloader_asset_id")
+
+
+class HeartbeatBuffer:
+    """Latest ping of each screen token, per database, kept in memory until the next bulk write.
+
+    Pings are written by the request that comes after the flush interval,
+    or else by a timer once the interval elapsed, so none stays buffered
+    longer than that on a worker that stops receiving pings. What is left
+    when the worker exits is written too.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._pings = defaultdict(dict)
+        self._flushed_at = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def record(self, dbname, token):
+        """Buffer a ping; return the buffered pings once the flush interval elapsed, else None"""
+        now = time.monotonic()
+        with self._lock:
+            self._pings[dbname][token] = fields.Datetime.now()
+            if now - self._flushed_at.get(dbname, 0) < self.interval:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return None
+            self._flushed_at[dbname] = now
+            return self._pings.pop(dbname)
+
+    def flush(self):
+        """Write all buffered pings, each database with a cursor of its own (timer and worker exit)"""
+        now = time.monotonic()
+        with self._lock:
+            pending = dict(self._pings)
+            self._pings.clear()
+            self._flushed_at.update(dict.fromkeys(pending, now))
+            self._timer = None
+        for dbname, pings in pending.items():
+            try:
+                with Registry(dbname).cursor() as cr:
+                    api.Environment(cr, SUPERUSER_ID, {})['ds.screen']._write_heartbeats(pings)
+            except Exception:  # noqa: BLE001
+                _logger.warning("Failed to write %s heartbeats of database %s", len(pings), dbname, exc_info=True)
+
+
+heartbeats = HeartbeatBuffer(HEARTBEAT_FLUSH_INTERVAL)
+atexit.register(heartbeats.flush)
 
 
 class DsScreen(models.Model):
     _name = "ds.screen"
+    _inherit = ["ds.payload.mixin"]
     _description = "Digital Signage Screen"
 
+    # Fields the player never sees: writing them keeps the cached payload
+    _payload_exempt_fields = {
+        "last_ping", "note",
+        "telemetry_at", "first_frame_avg_ms", "dropped_frame_rate", "heap_used_mb", "heap_limit_mb",
+    }
+    # Seconds between two heartbeats of a player
+    _ping_interval = 60
+
     name = fields.Char(required=True)
     token = fields.Char(default=lambda self: str(uuid.uuid4()), copy=False, index=True, readonly=True)
-    playlist_id = fields.Many2one("ds.playlist", string="Playlist", ondelete="set null")
+    playlist_id = fields.Many2one("ds.playlist", string="Playlist", ondelete="set null",
+                                  help="Played whenever no time slot of the schedule applies")
+    schedule_ids = fields.One2many("ds.screen.schedule", "screen_id", string="Schedule")
+    zone_ids = fields.One2many("ds.screen.zone", "screen_id", string="Layout",
+                               help="Regions of the screen each playing their own content. Without zones the screen schedule fills the screen.")
+    sync_group = fields.Char(string="Sync Group", index=True,
+                             help="Screens of the same group (e.g. a video wall) showing the same playlist play it in lockstep, "
+                                  "on a timeline shared through the server clock.")
+    tz = fields.Selection(_tz_get, string="Timezone", default=lambda self: self.env.user.tz or 'UTC',
+                          help="Timezone of the screen's location, in which schedule hours are expressed")
     preloader_asset_id = fields.Many2one("ds.asset", string="Preloader Asset", ondelete="set null", 
                                          help="Asset (usually an image or video) to display while loading each slide. Helps avoid browser default loading icons for external videos and YouTube.")
     show_fullscreen_button = fields.Boolean(string="Show Fullscreen Button", default=True,
@@ -18,15 +109,202 @@ class DsScreen(models.Model):
                                    help="Keep rendered slides in memory and reuse them when cycling through playlist. Improves performance by avoiding re-rendering. Best for images and videos.")
     preload_next_slide = fields.Boolean(string="Preload Next Slide", default=False,
                                         help="Load the next slide in background while current slide plays. Provides smoother transitions but uses more bandwidth and memory.")
+    preload_depth = fields.Integer(string="Preload Depth", default=1,
+                                   help="Number of upcoming slides loaded in background when Preload Next Slide is enabled.")
+    slide_cache_max_items = fields.Integer(string="Slide Cache Size", default=20,
+                                           help="Maximum number of rendered slides kept in memory when Cache Slides is enabled. Least recently shown slides are released first.")
+    slide_cache_max_mb = fields.Integer(string="Slide Cache Memory (MB)", default=256,
+                                        help="Estimated memory the cached slides may use. Lower it on devices with little RAM.")
+    manifest_poll_interval = fields.Integer(string="Update Check Interval (s)", default=60,
+                                            help="How often the player asks the server whether the playlist changed. Unchanged playlists cost a tiny 304 response; 0 disables checks.")
+    offline_enabled = fields.Boolean(string="Offline Playback", default=True,
+                                     help="Install a service worker that keeps the player and the playlist media in the browser storage, so the screen keeps playing when the network is down.")
+    offline_cache_mb = fields.Integer(string="Offline Storage Limit (MB)", default=500,
+                                      help="Maximum size of the media kept for offline playback on the device.")
     is_public = fields.Boolean(string="Public", default=True)
     active = fields.Boolean(default=True)
     last_ping = fields.Datetime(readonly=True)
+    # Latest performance summary uploaded by the player (see ds.player.telemetry)
+    telemetry_at = fields.Datetime(string="Last Telemetry", readonly=True)
+    first_frame_avg_ms = fields.Float(string="Time to First Frame (ms)", readonly=True,
+                                      help="Average time slides took to get on screen over the last reported period")
+    dropped_frame_rate = fields.Float(string="Dropped Frames (%)", readonly=True)
+    heap_used_mb = fields.Float(string="JS Heap Used (MB)", readonly=True)
+    heap_limit_mb = fields.Float(string="JS Heap Limit (MB)", readonly=True)
     note = fields.Text()
 
     _sql_constraints = [
         ("token_unique", "unique(token)", "Screen token must be unique."),
     ]
 
+    def write(self, vals):
+        res = super().write(vals)
+        if not set(vals) <= self._payload_exempt_fields:
+            self._bump_payload_version()
+        return res
+
+    def _bump_payload_version(self):
+        super()._bump_payload_version()
+        self._notify_players()
+
+    @api.model
+    def _get_bus_channel(self, token):
+        """Bus channel of the players of a screen; knowing it takes the (secret) token"""
+        return f"ds_signage.screen.{token}"
+
+    def _notify_players(self):
+        """Push a "revision changed" notification to the players of these screens.
+
+        One message per screen channel, sent once per transaction however many
+        times the screen is bumped; the bus delivers them after commit.
+        Players then fetch their manifest, answered with a 304 if nothing
+        they show changed after all.
+        """
+        notified = self.env.cr.precommit.data.setdefault('ds_signage.notified_screens', set())
+        screens = self.browse(set(self.ids) - notified)
+        if not screens:
+            return
+        notified.update(screens.ids)
+        self.env['bus.bus'].sudo()._sendmany([
+            (self._get_bus_channel(row['token']), BUS_NOTIFICATION_TYPE, {})
+            for row in screens.sudo().read(['token'])
+        ])
+
+    @api.model
+    def _get_payload_version(self, token):
+        """Return ``(screen_id, version)`` of the active screen with this token.
+
+        A single indexed query, cheap enough to validate a cached payload on
+        every request. ``version`` changes whenever the screen, its schedule,
+        one of the playlists it may play, their items or their assets are
+        written. Playlists of the layout zones count too.
+        """
+        self.flush_model(['token', 'active', 'playlist_id', 'payload_version'])
+        self.env['ds.screen.schedule'].flush_model(['screen_id', 'playlist_id'])
+        self.env['ds.screen.zone'].flush_model(['screen_id', 'playlist_id'])
+        self.env['ds.playlist'].flush_model(['payload_version'])
+        self.env.cr.execute("""
+            SELECT s.id, s.payload_version,
+                   ARRAY(SELECT p.id || ':' || p.payload_version
+                           FROM ds_playlist p
+                          WHERE p.id = s.playlist_id
+                             OR p.id IN (SELECT playlist_id FROM ds_screen_schedule WHERE screen_id = s.id)
+                             OR p.id IN (SELECT playlist_id FROM ds_screen_zone WHERE screen_id = s.id)
+                          ORDER BY p.id)
+              FROM ds_screen s
+             WHERE s.token = %s AND s.active
+        """, [token])
+        row = self.env.cr.fetchone()
+        if not row:
+            return None, None
+        return row[0], (row[1], tuple(row[2]))
+
+    def _build_schedule_index(self, start):
+        """Resolve the schedule of this screen from the epoch ``start`` over the schedule horizon.
+
+        Each state is ``(playlist_id, hidden_item_ids)``: the playlist on air
+        and those of its items, or of the playlists of the layout zones, that
+        are outside their own time window.
+        """
+        self.ensure_one()
+        start = int(start)
+        end = start + SCHEDULE_HORIZON
+        tz = pytz.timezone(self.tz or 'UTC')
+
+        slots = [(slot.playlist_id.id, slot._get_schedule_rule(start, end, tz)) for slot in self.schedule_ids]
+        zone_playlist_ids = set(self.zone_ids.playlist_id.ids)
+        playlist_ids = {self.playlist_id.id, *(playlist_id for playlist_id, _rule in slots), *zone_playlist_ids} - {False}
+        item_rules = {}
+        for item in self.env['ds.playlist.item'].search([('playlist_id', 'in', list(playlist_ids))]):
+            if item._is_scheduled():
+                item_rules.setdefault(item.playlist_id.id, []).append((item.id, item._get_schedule_rule(start, end, tz)))
+
+        boundaries = {start}
+        for _playlist_id, rule in slots:
+            boundaries.update(rule.boundaries())
+        for rules in item_rules.values():
+            for _item_id, rule in rules:
+                boundaries.update(rule.boundaries())
+
+        times, states = [], []
+        for ts in sorted(t for t in boundaries if start <= t < end):
+            playlist_id = next((playlist_id for playlist_id, rule in slots if ts in rule), self.playlist_id.id)
+            hidden = tuple(
+                item_id
+                for on_air in sorted({playlist_id, *zone_playlist_ids} - {False})
+                for item_id, rule in item_rules.get(on_air, ())
+                if ts not in rule
+            )
+            state = (playlist_id, hidden)
+            if states and states[-1] == state:
+                continue
+            times.append(ts)
+            states.append(state)
+        return ScheduleIndex(start, end, times, states)
+
+    @api.model
+    def _write_heartbeats(self, pings):
+        """Store buffered heartbeats ``{token: datetime}`` with a single UPDATE"""
+        if not pings:
+            return
+        self.env.cr.execute(SQL("""
+            UPDATE ds_screen s
+               SET last_ping = v.ts
+              FROM (VALUES %s) AS v(token, ts)
+             WHERE s.token = v.token
+               AND (s.last_ping IS NULL OR s.last_ping < v.ts)
+        """, SQL(", ").join(SQL("(%s, %s::timestamp)", token, ts) for token, ts in pings.items())))
+        self.invalidate_model(['last_ping'])
+
+    def _bulk_assign(self, vals):
+        """Set the playlist and/or preloader asset of all these screens with a single UPDATE.
+
+        ``vals`` may only hold the fields of :data:`BULK_ASSIGN_FIELDS`; a
+        false value clears the field.
+        """
+        unknown = set(vals) - set(BULK_ASSIGN_FIELDS)
+        if unknown:
+            raise UserError(_("These fields cannot be assigned in bulk: %s", ", ".join(sorted(unknown))))
+        if not self or not vals:
+            return
+        self.check_access('write')
+        comodels = {"playlist_id": "ds.playlist", "preloader_asset_id": "ds.asset"}
+        for fname, value in vals.items():
+            if value and not self.env[comodels[fname]].browse(value).exists():
+                raise UserError(_("Record %(id)s of %(model)s does not exist.", id=value, model=comodels[fname]))
+        self.env.cr.execute(SQL(
+            "UPDATE ds_screen SET %s, write_uid = %s, write_date = %s WHERE id IN %s",
+            SQL(", ").join(SQL("%s = %s", SQL.identifier(fname), value or None) for fname, value in vals.items()),
+            self.env.uid, self.env.cr.now(), tuple(self.ids),
+        ))
+        self.invalidate_recordset([*vals, 'write_uid', 'write_date'])
+        self._bump_payload_version()
+
+    def _regenerate_tokens(self):
+        """Give each of these screens a new token with a single UPDATE; players on the old URLs stop working"""
+        if not self:
+            return
+        self.check_access('write')
+        self.env.cr.execute(SQL("""
+            UPDATE ds_screen s
+               SET token = v.token, write_uid = %s, write_date = %s
+              FROM (VALUES %s) AS v(id, token)
+             WHERE s.id = v.id
+        """, self.env.uid, self.env.cr.now(),
+            SQL(", ").join(SQL("(%s, %s)", screen_id, str(uuid.uuid4())) for screen_id in self.ids)))
+        self.invalidate_recordset(['token', 'write_uid', 'write_date'])
+        self._bump_payload_version()
+
+    def _get_provisioning_data(self):
+        """Name, token and absolute player URL of these screens, for provisioning devices"""
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        return [{
+            'id': row['id'],
+            'name': row['name'],
+            'token': row['token'],
+            'url': f"{base_url}/ds/s/{row['token']}",
+        } for row in self.read(['name', 'token'])]
+
     def action_open_player(self):
         self.ensure_one()
         url = f"/ds/s/{self.token}"
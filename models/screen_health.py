@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models, tools
+from odoo.tools import SQL
+
+# Seconds without heartbeat after which a screen counts as offline
+OFFLINE_AFTER = 5 * 60
+# Seconds without heartbeat after which a screen counts as slow: pings are
+# sent every minute and written within half a minute, so a later one means
+# the player's main thread or network is struggling
+SLOW_AFTER = 2 * 60
+# Average time to first frame (ms) from which a screen counts as slow, per its latest telemetry
+SLOW_FIRST_FRAME_MS = 3000
+# Share of dropped video frames (percent) from which a screen counts as slow, per its latest telemetry
+SLOW_DROPPED_FRAME_RATE = 5.0
+# Share of failed slides (percent, over the last day) from which a screen counts as failing
+FAILING_ERROR_RATE = 10.0
+# Hours of proof of play the error rate is computed over
+HEALTH_WINDOW_HOURS = 24
+
+
+class DsScreenHealth(models.Model):
+    """Health of each active screen: offline, failing, slow (late heartbeats, slow slides or dropped frames) or ok"""
+    _name = "ds.screen.health"
+    _description = "Digital Signage Screen Health"
+    _auto = False
+    _order = "state_priority, error_rate desc, screen_id"
+
+    screen_id = fields.Many2one("ds.screen", string="Screen", readonly=True)
+    last_ping = fields.Datetime(readonly=True)
+    ping_age = fields.Integer(string="Since Last Ping (s)", readonly=True)
+    play_count = fields.Integer(string="Plays (24h)", readonly=True, aggregator="sum")
+    error_count = fields.Integer(string="Errors (24h)", readonly=True, aggregator="sum")
+    error_rate = fields.Float(string="Error Rate (%)", readonly=True, aggregator="avg")
+    first_frame_avg_ms = fields.Float(string="Time to First Frame (ms)", readonly=True, aggregator="avg")
+    dropped_frame_rate = fields.Float(string="Dropped Frames (%)", readonly=True, aggregator="avg")
+    heap_used_mb = fields.Float(string="JS Heap Used (MB)", readonly=True, aggregator="avg")
+    state = fields.Selection([
+        ("offline", "Offline"),
+        ("failing", "Failing"),
+        ("slow", "Slow"),
+        ("ok", "OK"),
+    ], readonly=True)
+    state_priority = fields.Integer(readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        # Hourly statistics, plus the raw events the rollup has not counted yet
+        self.env.cr.execute(SQL("""
+            CREATE OR REPLACE VIEW %(table)s AS (
+                WITH activity AS (
+                    SELECT screen_id, sum(play_count) AS plays, sum(error_count) AS errors
+                      FROM ds_play_stat
+                     WHERE hour >= date_trunc('hour', now() AT TIME ZONE 'UTC') - %(window)s * interval '1 hour'
+                  GROUP BY screen_id
+                 UNION ALL
+                    SELECT screen_id,
+                           count(*) FILTER (WHERE event_type = 'play'),
+                           count(*) FILTER (WHERE event_type = 'error')
+                      FROM ds_play_event
+                     WHERE NOT rolled_up
+                  GROUP BY screen_id
+                ), totals AS (
+                    SELECT screen_id, sum(plays) AS plays, sum(errors) AS errors
+                      FROM activity
+                  GROUP BY screen_id
+                ), screens AS (
+                    SELECT s.id,
+                           s.last_ping,
+                           EXTRACT(EPOCH FROM (now() AT TIME ZONE 'UTC') - s.last_ping)::integer AS ping_age,
+                           COALESCE(t.plays, 0)::integer AS play_count,
+                           COALESCE(t.errors, 0)::integer AS error_count,
+                           CASE WHEN COALESCE(t.plays, 0) + COALESCE(t.errors, 0) > 0
+                                THEN 100.0 * t.errors / (t.plays + t.errors)
+                                ELSE 0 END AS error_rate,
+                           -- Performance figures only count while the player keeps reporting them
+                           CASE WHEN s.telemetry_at >= (now() AT TIME ZONE 'UTC') - %(window)s * interval '1 hour'
+                                THEN TRUE ELSE FALSE END AS has_telemetry,
+                           s.first_frame_avg_ms,
+                           s.dropped_frame_rate,
+                           s.heap_used_mb
+                      FROM ds_screen s
+                 LEFT JOIN totals t ON t.screen_id = s.id
+                     WHERE s.active
+                )
+                SELECT id,
+                       id AS screen_id,
+                       last_ping,
+                       ping_age,
+                       play_count,
+                       error_count,
+                       error_rate,
+                       first_frame_avg_ms,
+                       dropped_frame_rate,
+                       heap_used_mb,
+                       CASE WHEN ping_age IS NULL OR ping_age >= %(offline)s THEN 'offline'
+                            WHEN error_rate >= %(failing)s THEN 'failing'
+                            WHEN ping_age >= %(slow)s
+                              OR has_telemetry AND (first_frame_avg_ms >= %(slow_first_frame)s
+                                                    OR dropped_frame_rate >= %(slow_dropped)s) THEN 'slow'
+                            ELSE 'ok' END AS state,
+                       CASE WHEN ping_age IS NULL OR ping_age >= %(offline)s THEN 0
+                            WHEN error_rate >= %(failing)s THEN 1
+                            WHEN ping_age >= %(slow)s
+                              OR has_telemetry AND (first_frame_avg_ms >= %(slow_first_frame)s
+                                                    OR dropped_frame_rate >= %(slow_dropped)s) THEN 2
+                            ELSE 3 END AS state_priority
+                  FROM screens
+            )
+        """, table=SQL.identifier(self._table), window=HEALTH_WINDOW_HOURS,
+            offline=OFFLINE_AFTER, failing=FAILING_ERROR_RATE, slow=SLOW_AFTER,
+            slow_first_frame=SLOW_FIRST_FRAME_MS, slow_dropped=SLOW_DROPPED_FRAME_RATE))
+
+    def action_open_screen(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": "ds.screen",
+            "res_id": self.screen_id.id,
+            "view_mode": "form",
+        }
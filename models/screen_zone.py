@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+
+
+class DsScreenZone(models.Model):
+    _name = "ds.screen.zone"
+    _description = "Digital Signage Screen Zone"
+    _order = "screen_id, sequence, id"
+
+    sequence = fields.Integer(default=10, help="Zones are stacked in this order, the last one on top")
+    screen_id = fields.Many2one("ds.screen", required=True, ondelete="cascade", index=True)
+    name = fields.Char(required=True)
+    content = fields.Selection([
+        ("schedule", "Screen Schedule"),
+        ("playlist", "Playlist"),
+    ], required=True, default="playlist",
+        help="Screen Schedule: what the screen plays by default or in its time slots. "
+             "Playlist: a playlist of its own, looping on its own timeline.")
+    playlist_id = fields.Many2one("ds.playlist", string="Playlist", ondelete="set null")
+    # Position and size in percent of the screen
+    x = fields.Float(string="Left (%)", default=0.0)
+    y = fields.Float(string="Top (%)", default=0.0)
+    width = fields.Float(string="Width (%)", default=100.0)
+    height = fields.Float(string="Height (%)", default=100.0)
+
+    @api.constrains("x", "y", "width", "height")
+    def _check_geometry(self):
+        for zone in self:
+            if not (0 <= zone.x < 100 and 0 <= zone.y < 100 and zone.width > 0 and zone.height > 0
+                    and zone.x + zone.width <= 100 and zone.y + zone.height <= 100):
+                raise ValidationError(_("Zone %s must lie within the screen (0 to 100%%).", zone.name))
+
+    @api.constrains("screen_id", "content")
+    def _check_single_schedule_zone(self):
+        for screen in self.screen_id:
+            if len(screen.zone_ids.filtered(lambda z: z.content == "schedule")) > 1:
+                raise ValidationError(_("Only one zone of screen %s may show the screen schedule.", screen.name))
+
+    def _get_layout(self):
+        """Regions of these zones as sent to the player, in stacking order"""
+        return [{
+            'id': str(zone.id),
+            'name': zone.name,
+            'rect': [zone.x, zone.y, zone.width, zone.height],
+            'main': zone.content == "schedule",
+        } for zone in self]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        zones = super().create(vals_list)
+        zones.screen_id._bump_payload_version()
+        return zones
+
+    def write(self, vals):
+        screens = self.screen_id
+        res = super().write(vals)
+        (screens | self.screen_id)._bump_payload_version()
+        return res
+
+    def unlink(self):
+        self.screen_id._bump_payload_version()
+        return super().unlink()
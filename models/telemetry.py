@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta, timezone
+
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+# Most assets accepted in one player summary
+MAX_TELEMETRY_ASSETS = 500
+# Days of player telemetry kept
+TELEMETRY_RETENTION_DAYS = 30
+
+
+def _count(value, limit=10 ** 9):
+    """A non-negative number from a player summary, bounded; raises ValueError/TypeError on garbage"""
+    return min(max(float(value), 0.0), limit)
+
+
+class DsPlayerTelemetry(models.Model):
+    _name = "ds.player.telemetry"
+    _description = "Digital Signage Player Performance"
+    _order = "period_end desc, id desc"
+    # High-volume raw rows: skip create/write user and date columns
+    _log_access = False
+
+    screen_id = fields.Many2one("ds.screen", required=True, ondelete="cascade", index=True, readonly=True)
+    asset_id = fields.Many2one("ds.asset", required=True, ondelete="cascade", index=True, readonly=True)
+    period_start = fields.Datetime(required=True, readonly=True)
+    period_end = fields.Datetime(required=True, readonly=True)
+    show_count = fields.Integer(string="Showings", readonly=True, aggregator="sum")
+    first_frame_count = fields.Integer(string="First Frames", readonly=True, aggregator="sum",
+                                       help="Showings whose content got on screen")
+    first_frame_total_ms = fields.Float(string="Total Time to First Frame (ms)", readonly=True, aggregator="sum")
+    first_frame_avg_ms = fields.Float(string="Time to First Frame (ms)", readonly=True, aggregator="avg")
+    first_frame_max_ms = fields.Float(string="Slowest First Frame (ms)", readonly=True, aggregator="max")
+    stall_count = fields.Integer(string="Stalls", readonly=True, aggregator="sum",
+                                 help="Times a video ran out of data while playing")
+    stall_ms = fields.Float(string="Stalled (ms)", readonly=True, aggregator="sum")
+    dropped_frames = fields.Integer(string="Dropped Frames", readonly=True, aggregator="sum")
+    total_frames = fields.Integer(string="Video Frames", readonly=True, aggregator="sum")
+
+    @api.model
+    def _ingest(self, screen, summary):
+        """Store a performance summary uploaded by a player.
+
+        ``summary`` is the compact dict built by player.js: ``s`` and ``e``
+        the period (epoch milliseconds), ``h`` the JS heap ``[used, limit]``
+        in MB when the browser reports it, and ``a`` per asset id the list
+        ``[showings, first frames, first frame total ms, first frame max ms,
+        stalls, stalled ms, dropped frames, video frames]``. Malformed or
+        unknown entries are dropped. The screen keeps the latest figures.
+        """
+        now = fields.Datetime.now()
+        try:
+            period_end = datetime.fromtimestamp(float(summary['e']) / 1000.0, tz=timezone.utc).replace(tzinfo=None)
+            period_start = datetime.fromtimestamp(float(summary['s']) / 1000.0, tz=timezone.utc).replace(tzinfo=None)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return self.browse()
+        if not (now - timedelta(days=1) < period_end < now + timedelta(hours=1)) or period_start > period_end:
+            return self.browse()
+
+        assets = summary.get('a') if isinstance(summary.get('a'), dict) else {}
+        asset_ids = {int(key) for key in list(assets)[:MAX_TELEMETRY_ASSETS] if str(key).isdigit()}
+        known_assets = set(self.env['ds.asset'].sudo().browse(asset_ids).exists().ids)
+        vals_list = []
+        for key, values in assets.items():
+            if not str(key).isdigit() or int(key) not in known_assets:
+                continue
+            try:
+                shows, first_frames, first_frame_total, first_frame_max, stalls, stall_ms, dropped, frames = (
+                    _count(value) for value in values[:8]
+                )
+            except (TypeError, ValueError):
+                continue
+            vals_list.append({
+                'screen_id': screen.id,
+                'asset_id': int(key),
+                'period_start': period_start,
+                'period_end': period_end,
+                'show_count': int(shows),
+                'first_frame_count': int(first_frames),
+                'first_frame_total_ms': first_frame_total,
+                'first_frame_avg_ms': first_frame_total / first_frames if first_frames else 0.0,
+                'first_frame_max_ms': first_frame_max,
+                'stall_count': int(stalls),
+                'stall_ms': stall_ms,
+                'dropped_frames': int(dropped),
+                'total_frames': int(frames),
+            })
+        records = self.sudo().create(vals_list)
+
+        screen_vals = {'telemetry_at': now}
+        first_frames = sum(vals['first_frame_count'] for vals in vals_list)
+        if first_frames:
+            screen_vals['first_frame_avg_ms'] = sum(vals['first_frame_total_ms'] for vals in vals_list) / first_frames
+        frames = sum(vals['total_frames'] for vals in vals_list)
+        if frames:
+            screen_vals['dropped_frame_rate'] = 100.0 * sum(vals['dropped_frames'] for vals in vals_list) / frames
+        heap = summary.get('h')
+        if isinstance(heap, list) and len(heap) == 2:
+            try:
+                screen_vals['heap_used_mb'], screen_vals['heap_limit_mb'] = (_count(value, 10 ** 6) for value in heap)
+            except (TypeError, ValueError):
+                pass
+        screen.sudo().write(screen_vals)
+        return records
+
+    @api.autovacuum
+    def _gc_telemetry(self):
+        self.env.cr.execute(SQL(
+            "DELETE FROM ds_player_telemetry WHERE period_end < %s",
+            fields.Datetime.now() - timedelta(days=TELEMETRY_RETENTION_DAYS),
+        ))
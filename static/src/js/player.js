@@ -1,3 +1,5 @@
+/** @odoo-module ignore **/
+// Plain script: the player bundle ships without Odoo's module loader
 document.addEventListener('DOMContentLoaded', function() {
   'use strict';
   
@@ -19,18 +21,32 @@ document.addEventListener('DOMContentLoaded', function() {
     }
   }
 
-  const slides = Array.isArray(readJsonScript('ds_slides')) ? readJsonScript('ds_slides') : [];
+  const initialSlides = Array.isArray(readJsonScript('ds_slides')) ? readJsonScript('ds_slides') : [];
+  const initialZoneSlides = readJsonScript('ds_zones') || {};
   const meta = readJsonScript('ds_meta') || {};
   const autoUnmute = meta.auto_unmute || false;
   const preloaderConfig = meta.preloader || null;
   const showFullscreenButton = meta.show_fullscreen_button !== false; // Default to true
   const cacheSlides = meta.cache_slides || false;
   const preloadNextSlide = meta.preload_next_slide || false;
+  const preloadDepth = Math.max(1, parseInt(meta.preload_depth || 1, 10));
+  const slideCacheConfig = meta.slide_cache || {};
+  const manifestUrl = meta.manifest_url || null;
+  const manifestPollInterval = parseInt(meta.manifest_poll_interval || 0, 10);
+  const offlineConfig = meta.offline || null;
+  const busConfig = meta.bus || null;
+  const pingUrl = meta.ping_url || null;
+  const pingInterval = parseInt(meta.ping_interval || 0, 10);
+  const eventsUrl = meta.events_url || null;
+  const eventsFlushInterval = parseInt(meta.events_flush_interval || 30, 10);
+  const syncConfig = meta.sync || null;
+  const telemetryUrl = meta.telemetry_url || null;
+  const telemetryInterval = parseInt(meta.telemetry_interval || 300, 10);
   const root = document.getElementById('ds_player_root');
   const container = document.getElementById('ds_player');
   
   console.log('DS Player: Elements found - root:', !!root, 'container:', !!container);
-  console.log('DS Player: Slides count:', slides.length);
+  console.log('DS Player: Slides count:', initialSlides.length);
   console.log('DS Player: Meta:', meta);
   
   if (!container) {
@@ -40,39 +56,748 @@ document.addEventListener('DOMContentLoaded', function() {
 
   document.title = meta.title || 'Digital Signage';
 
-  let idx = -1;
-  let timer = null;
-  let preloaderOverlay = null;
   let preloadedPreloaderElement = null;
-  const slideCache = {}; // Cache for rendered slide elements
-  let preloadedSlideElement = null; // Preloaded next slide
+  // Regions of the screen, each playing its own slides on its own timeline.
+  // Without a layout the whole player is a single main zone.
+  const zones = [];
+  // Rendered slide elements, bounded by count and estimated memory
+  const slideCache = createSlideCache(
+    parseInt(slideCacheConfig.max_items || 20, 10),
+    parseInt(slideCacheConfig.max_mb || 256, 10) * 1024 * 1024
+  );
+  const preloading = {}; // Slide ids being preloaded, to avoid duplicate downloads
+  let revision = meta.revision || null; // Revision of the slides currently playing
+  let pendingManifest = null; // Newer manifest, applied at the next slide boundary
+  const htmlRequests = {}; // In-flight QWeb fragment fetches by slide id
+  // Settings that require a page reload when they change; the rest changes with the schedule
+  const SCHEDULED_META_KEYS = ['revision', 'next_transition', 'title', 'playlist_id'];
+  const metaSignature = JSON.stringify(Object.fromEntries(Object.entries(meta).filter(([k]) => !SCHEDULED_META_KEYS.includes(k))));
+  // The manifest of the next schedule transition is fetched this long before it is due
+  const TRANSITION_PREFETCH_MS = 60 * 1000;
+  let transitionTimer = null;
 
-  function clear() {
-    if (timer) {
-      clearTimeout(timer);
-      timer = null;
-    }
+  function createZone(id, el, zoneSlides, main) {
+    return {
+      id: id,
+      el: el,
+      main: main,
+      slides: zoneSlides,
+      idx: -1,
+      dueAt: null, // Zone clock time (see zoneClock()) when the current slide ends
+      slideStart: null, // Synchronized playback: server time the current slide started at
+      slideEnd: null,
+      preloaderOverlay: null,
+      currentPlay: null,
+      showing: null, // Performance of the slide on screen, see startShowing()
+    };
+  }
+
+  // The zone showing the screen's (scheduled) playlist; manifests are applied at its slide boundaries
+  function primaryZone() {
+    return zones.find(zone => zone.main) || zones[0];
+  }
+
+  function zoneSlidesFrom(manifestSlides, manifestZones, zone) {
+    const zoneSlides = zone.main ? manifestSlides : (manifestZones || {})[zone.id];
+    return Array.isArray(zoneSlides) ? zoneSlides : [];
+  }
+
+  function clear(zone) {
+    zone.dueAt = null;
     // Remove all children except the preloader overlay
-    const children = Array.from(container.children);
+    const children = Array.from(zone.el.children);
     for (const child of children) {
-      if (child !== preloaderOverlay) {
-        container.removeChild(child);
+      if (child !== zone.preloaderOverlay) {
+        zone.el.removeChild(child);
       }
     }
   }
 
-  function next() {
-    if (!slides.length) {
-      console.log('DS Player: No slides available in next()');
+  function next(zone) {
+    if (zone === primaryZone() && pendingManifest && applyManifest(pendingManifest)) {
+      return;
+    }
+    const zoneSlides = zone.slides;
+    if (!zoneSlides.length) {
+      console.log('DS Player: No slides available in next() for zone', zone.id);
       return;
     }
-    idx = (idx + 1) % slides.length;
-    console.log('DS Player: Moving to slide', idx, 'of', slides.length);
-    render(slides[idx]);
+    if (syncConfig) {
+      // Never resolve a boundary that was already played, whatever the rounding of the clock
+      const position = timelinePosition(zoneSlides, Math.max(syncNow(), zone.slideEnd || 0));
+      zone.idx = position.idx;
+      zone.slideStart = position.start;
+      zone.slideEnd = position.end;
+    } else {
+      zone.idx = (zone.idx + 1) % zoneSlides.length;
+    }
+    console.log('DS Player: Zone', zone.id, 'moving to slide', zone.idx, 'of', zoneSlides.length);
+    recordPlay(zone, zoneSlides[zone.idx]);
+    render(zone, zoneSlides[zone.idx]);
+    // Start rendering the next QWeb slide on the server while this one shows
+    prefetchSlideHtml(zoneSlides[(zone.idx + 1) % zoneSlides.length]);
+  }
+
+  // Images are served resized to their zone (in device pixels) once the server has renditions
+  function mediaUrl(slide, zone) {
+    if (!slide || slide.type !== 'image' || !slide.src) return slide && slide.src;
+    const cssWidth = (zone && zone.el.clientWidth) || window.innerWidth;
+    const width = Math.ceil(cssWidth * (window.devicePixelRatio || 1));
+    return `${slide.src}${slide.src.includes('?') ? '&' : '?'}w=${width}`;
+  }
+
+  // QWeb slides are rendered server-side and fetched lazily, just before they are due
+  function prefetchSlideHtml(slide) {
+    if (!slide || slide.type !== 'qweb' || !slide.html_src || htmlRequests[slide.id]) return;
+    htmlRequests[slide.id] = fetch(slide.html_src, { credentials: 'same-origin' })
+      .then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.text();
+      })
+      .catch(err => {
+        console.error('DS Player: QWeb slide failed to load:', slide.name, err);
+        recordError(slide, `QWeb slide failed to load: ${err}`);
+        return `<div class="ds-error">Failed to load ${slide.name}</div>`;
+      });
+  }
+
+  // The HTML of a QWeb slide; each showing fetches it again (the browser cache honours the render TTL)
+  function fetchSlideHtml(slide) {
+    if (!slide.html_src) return Promise.resolve(slide.html || '');
+    prefetchSlideHtml(slide);
+    const request = htmlRequests[slide.id];
+    delete htmlRequests[slide.id];
+    return request;
+  }
+
+  // Synchronized playback: the screens of a sync group estimate the server
+  // time (NTP-style, over HTTP) and derive what plays from a shared epoch
+  // and the cumulative slide durations, so they all agree without talking
+  // to each other
+  const TIME_SYNC_SAMPLES = 5;
+  const TIME_SYNC_INTERVAL_MS = 5 * 60 * 1000;
+  // Corrections smaller than this are slewed (at SLEW_RATE ms per ms) rather than stepped
+  const CLOCK_STEP_THRESHOLD_MS = 1000;
+  const CLOCK_SLEW_RATE = 0.05;
+  // Videos further than this from the timeline are nudged with their playback rate
+  const VIDEO_DRIFT_TOLERANCE_S = 0.03;
+  const VIDEO_SEEK_THRESHOLD_S = 1;
+  // Monotonic wall clock of this device: immune to system clock changes
+  const localNow = () => performance.timeOrigin + performance.now();
+  let clockOffset = Date.now() - localNow(); // Applied offset: server time = localNow() + clockOffset
+  let targetOffset = null; // Latest estimate, reached gradually
+  let lastSlewAt = performance.now();
+  let lastVideoCheckAt = 0;
+
+  function syncNow() {
+    return localNow() + clockOffset;
+  }
+
+  // One round trip: offset and delay, as NTP computes them from four timestamps
+  function sampleClock() {
+    const t0 = localNow();
+    return fetch(syncConfig.time_url, { cache: 'no-store' })
+      .then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+      })
+      .then(({ t1, t2 }) => {
+        const t3 = localNow();
+        return { offset: ((t1 - t0) + (t2 - t3)) / 2, delay: (t3 - t0) - (t2 - t1) };
+      });
+  }
+
+  // Keep the sample with the shortest round trip: its offset is the least skewed by queuing
+  function syncClock() {
+    let chain = Promise.resolve([]);
+    for (let i = 0; i < TIME_SYNC_SAMPLES; i++) {
+      chain = chain.then(samples => sampleClock().then(sample => samples.concat([sample]), () => samples));
+    }
+    return chain.then(samples => {
+      if (!samples.length) {
+        console.log('DS Player: Time sync failed, keeping the current clock');
+        return;
+      }
+      const best = samples.reduce((a, b) => (b.delay < a.delay ? b : a));
+      if (targetOffset === null) {
+        clockOffset = best.offset; // First estimate, before anything played: step
+      }
+      targetOffset = best.offset;
+      console.log('DS Player: Clock offset', Math.round(best.offset), 'ms, round trip', Math.round(best.delay), 'ms');
+    });
+  }
+
+  // Move the applied offset towards the estimate without visible jumps
+  function slewClock(now) {
+    const elapsed = now - lastSlewAt;
+    lastSlewAt = now;
+    if (targetOffset === null || targetOffset === clockOffset) return;
+    const error = targetOffset - clockOffset;
+    if (Math.abs(error) >= CLOCK_STEP_THRESHOLD_MS) {
+      clockOffset = targetOffset;
+    } else {
+      clockOffset += Math.sign(error) * Math.min(Math.abs(error), elapsed * CLOCK_SLEW_RATE);
+    }
   }
 
-  function wait(ms) {
-    timer = setTimeout(next, ms);
+  function slideDurationMs(slide) {
+    return Math.max(1, parseInt(slide.duration || 10, 10)) * 1000;
+  }
+
+  // The slide of the timeline playing at server time ``at``, with its start and end
+  function timelinePosition(zoneSlides, at) {
+    const total = zoneSlides.reduce((sum, slide) => sum + slideDurationMs(slide), 0);
+    const loopStart = at - ((at - (syncConfig.epoch || 0)) % total);
+    let start = loopStart;
+    for (let i = 0; i < zoneSlides.length; i++) {
+      const end = start + slideDurationMs(zoneSlides[i]);
+      if (at < end) return { idx: i, start: start, end: end };
+      start = end;
+    }
+    return { idx: 0, start: loopStart + total, end: loopStart + total + slideDurationMs(zoneSlides[0]) };
+  }
+
+  // Videos of synchronized zones follow the timeline: a late start seeks
+  // once, small drift is absorbed by a slightly faster or slower playback
+  function alignVideos() {
+    for (const zone of zones) {
+      const video = zone.el.querySelector('video');
+      if (!video || video.paused || video.readyState < 2 || zone.slideStart === null) continue;
+      const expected = (syncNow() - zone.slideStart) / 1000;
+      if (!(expected < video.duration)) continue;
+      const drift = video.currentTime - expected;
+      if (Math.abs(drift) >= VIDEO_SEEK_THRESHOLD_S) {
+        video.currentTime = expected;
+        video.playbackRate = 1;
+      } else if (Math.abs(drift) > VIDEO_DRIFT_TOLERANCE_S) {
+        video.playbackRate = drift > 0 ? 0.95 : 1.05;
+      } else if (video.playbackRate !== 1) {
+        video.playbackRate = 1;
+      }
+    }
+  }
+
+  // A single clock drives every zone: each zone records when its slide is
+  // due, and one animation-frame loop advances the zones whose time came.
+  // Synchronized screens count in server time, the others locally.
+  function zoneClock() {
+    return syncConfig ? syncNow() : performance.now();
+  }
+
+  function wait(zone, ms) {
+    zone.dueAt = syncConfig ? zone.slideEnd : performance.now() + ms;
+  }
+
+  // Synchronized zones hold the last frame of a video until their timeline moves on
+  function videoEnded(zone) {
+    if (!syncConfig) next(zone);
+  }
+
+  function advanceZones() {
+    if (syncConfig) {
+      const now = performance.now();
+      slewClock(now);
+      if (now - lastVideoCheckAt >= 250) {
+        lastVideoCheckAt = now;
+        alignVideos();
+      }
+    }
+    const now = zoneClock();
+    for (const zone of zones) {
+      if (zone.dueAt !== null && now >= zone.dueAt) {
+        zone.dueAt = null;
+        next(zone);
+      }
+    }
+  }
+
+  function tick() {
+    advanceZones();
+    requestAnimationFrame(tick);
+  }
+
+  // Swap in a newer playlist; returns true when the page has to reload instead
+  function applyManifest(manifest) {
+    pendingManifest = null;
+    const manifestMeta = Object.fromEntries(Object.entries(manifest.meta || {}).filter(([k]) => !SCHEDULED_META_KEYS.includes(k)));
+    if (JSON.stringify(manifestMeta) !== metaSignature) {
+      // Player settings changed (preloader, caching, ...): start over with a fresh page
+      console.log('DS Player: Screen settings changed, reloading');
+      window.location.reload();
+      return true;
+    }
+    revision = manifest.revision;
+    document.title = (manifest.meta && manifest.meta.title) || document.title;
+    scheduleTransition(manifest.next_transition);
+    // Cached elements may show outdated content
+    slideCache.clear();
+    Object.keys(htmlRequests).forEach(key => delete htmlRequests[key]);
+    const primary = primaryZone();
+    for (const zone of zones) {
+      const currentId = zone.idx >= 0 && zone.slides[zone.idx] ? zone.slides[zone.idx].id : null;
+      zone.slides = zoneSlidesFrom(manifest.slides, manifest.zones, zone);
+      // Carry on after the slide that was showing, or restart from the top
+      zone.idx = zone.slides.findIndex(s => s.id === currentId);
+      // The primary zone is at a slide boundary; the others switch right away
+      // since the cache that held their slides was just emptied
+      if (zone !== primary) next(zone);
+    }
+    console.log('DS Player: Switched to playlist revision', revision, 'with', primary.slides.length, 'slides');
+    syncOfflineCache();
+    return false;
+  }
+
+  // Proof of play: events are buffered here and uploaded in batches
+  const MAX_BUFFERED_EVENTS = 1000;
+  const playEvents = [];
+
+  function pushEvent(event) {
+    if (!eventsUrl) return;
+    playEvents.push(event);
+    // Keep the most recent events when the server is unreachable for long
+    if (playEvents.length > MAX_BUFFERED_EVENTS) {
+      playEvents.splice(0, playEvents.length - MAX_BUFFERED_EVENTS);
+    }
+  }
+
+  // A slide starts showing in a zone; the previous one is logged with the time it stayed on screen
+  function recordPlay(zone, slide) {
+    finishPlay(zone);
+    zone.currentPlay = { a: slide.id, t: Date.now() };
+    startShowing(zone, slide);
+  }
+
+  function finishPlay(zone) {
+    const play = zone.currentPlay;
+    if (play && !play.failed) {
+      pushEvent({ a: play.a, t: play.t, d: (Date.now() - play.t) / 1000 });
+    }
+    zone.currentPlay = null;
+    finishShowing(zone);
+  }
+
+  // Performance telemetry: time to first frame, video stalls and dropped
+  // frames, aggregated per asset between two uploads, plus the JS heap
+  let telemetry = {};
+  let telemetryStart = Date.now();
+  let heapUsedMax = 0;
+
+  function assetTelemetry(slide) {
+    // [showings, first frames, first frame total ms, first frame max ms, stalls, stalled ms, dropped frames, video frames]
+    return telemetry[slide.id] || (telemetry[slide.id] = [0, 0, 0, 0, 0, 0, 0, 0]);
+  }
+
+  function startShowing(zone, slide) {
+    if (!telemetryUrl) return;
+    zone.showing = { slide: slide, start: performance.now(), firstFrame: false, video: null, quality: null, stalledAt: null };
+    assetTelemetry(slide)[0]++;
+    if (performance.memory) {
+      heapUsedMax = Math.max(heapUsedMax, performance.memory.usedJSHeapSize);
+    }
+  }
+
+  // The content of the slide showing in a zone got on screen
+  function markFirstFrame(zone, slide) {
+    const showing = zone.showing;
+    if (!showing || showing.slide !== slide || showing.firstFrame) return;
+    showing.firstFrame = true;
+    const ms = performance.now() - showing.start;
+    const stats = assetTelemetry(slide);
+    stats[1]++;
+    stats[2] += ms;
+    stats[3] = Math.max(stats[3], ms);
+  }
+
+  function videoQuality(video) {
+    return video.getVideoPlaybackQuality ? video.getVideoPlaybackQuality() : null;
+  }
+
+  // Follow a video element of a zone; elements are reused by the slide cache, so listen once
+  function watchVideo(zone, slide, video) {
+    if (zone.showing && zone.showing.slide === slide) {
+      zone.showing.video = video;
+    }
+    if (!telemetryUrl || video.dsWatched) return;
+    video.dsWatched = true;
+    const current = () => (zone.showing && zone.showing.video === video ? zone.showing : null);
+    video.addEventListener('playing', () => {
+      const showing = current();
+      if (!showing) return;
+      markFirstFrame(zone, showing.slide);
+      if (!showing.quality) {
+        const quality = videoQuality(video);
+        showing.quality = quality && { dropped: quality.droppedVideoFrames, total: quality.totalVideoFrames };
+      }
+      if (showing.stalledAt !== null) {
+        assetTelemetry(showing.slide)[5] += performance.now() - showing.stalledAt;
+        showing.stalledAt = null;
+      }
+    });
+    video.addEventListener('waiting', () => {
+      const showing = current();
+      // Buffering before the first frame is part of the time to first frame
+      if (!showing || !showing.firstFrame || showing.stalledAt !== null) return;
+      showing.stalledAt = performance.now();
+      assetTelemetry(showing.slide)[4]++;
+    });
+  }
+
+  function finishShowing(zone) {
+    const showing = zone.showing;
+    zone.showing = null;
+    if (!showing || !showing.video) return;
+    const stats = assetTelemetry(showing.slide);
+    if (showing.stalledAt !== null) {
+      stats[5] += performance.now() - showing.stalledAt;
+    }
+    const quality = showing.quality && videoQuality(showing.video);
+    if (quality) {
+      stats[6] += Math.max(0, quality.droppedVideoFrames - showing.quality.dropped);
+      stats[7] += Math.max(0, quality.totalVideoFrames - showing.quality.total);
+    }
+  }
+
+  // Upload the summary of the period and start a new one; best effort, lost if the upload fails
+  function flushTelemetry() {
+    if (!telemetryUrl || !Object.keys(telemetry).length) return;
+    const summary = {
+      s: telemetryStart,
+      e: Date.now(),
+      h: performance.memory
+        ? [heapUsedMax / 1048576, performance.memory.jsHeapSizeLimit / 1048576].map(mb => Math.round(mb * 10) / 10)
+        : null,
+      a: Object.fromEntries(Object.entries(telemetry).map(([id, stats]) => [id, stats.map(Math.round)])),
+    };
+    telemetry = {};
+    telemetryStart = summary.e;
+    heapUsedMax = 0;
+    const body = new Blob([JSON.stringify(summary)], { type: 'application/json' });
+    if (navigator.sendBeacon && navigator.sendBeacon(telemetryUrl, body)) return;
+    fetch(telemetryUrl, { method: 'POST', body: body, keepalive: true }).catch(err => {
+      console.log('DS Player: Telemetry upload failed:', err);
+    });
+  }
+
+  // A slide failed: log the error, and do not count it as played
+  function recordError(slide, message) {
+    console.log('DS Player: Recording failure of slide', slide.name, message);
+    pushEvent({ a: slide.id, t: Date.now(), e: String(message).slice(0, 200) });
+    for (const zone of zones) {
+      if (zone.currentPlay && zone.currentPlay.a === slide.id) {
+        zone.currentPlay.failed = true;
+      }
+    }
+  }
+
+  function flushEvents() {
+    if (!eventsUrl || !playEvents.length) return;
+    const batch = playEvents.splice(0, playEvents.length);
+    const body = new Blob([JSON.stringify(batch)], { type: 'application/json' });
+    if (navigator.sendBeacon && navigator.sendBeacon(eventsUrl, body)) return;
+    fetch(eventsUrl, { method: 'POST', body: body, keepalive: true })
+      .then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      })
+      .catch(err => {
+        console.log('DS Player: Event upload failed, keeping events:', err);
+        playEvents.unshift(...batch);
+      });
+  }
+
+  // Heartbeat so the backend knows the screen is alive (fire and forget)
+  function ping() {
+    if (navigator.sendBeacon) {
+      navigator.sendBeacon(pingUrl);
+    } else {
+      fetch(pingUrl, { method: 'POST', keepalive: true }).catch(() => {});
+    }
+  }
+
+  // Offline playback: the service worker keeps the player shell and the playlist media
+  function registerServiceWorker() {
+    if (!offlineConfig || !('serviceWorker' in navigator)) return;
+    navigator.serviceWorker.register(offlineConfig.service_worker, { scope: '/ds/' })
+      .then(() => {
+        console.log('DS Player: Service worker registered');
+        syncOfflineCache();
+      })
+      .catch(err => {
+        console.log('DS Player: Service worker registration failed:', err);
+      });
+  }
+
+  // Tell the service worker which media to keep: it precaches them and evicts the rest
+  function syncOfflineCache() {
+    if (!offlineConfig || !('serviceWorker' in navigator)) return;
+    const media = zones.flatMap(zone => zone.slides
+      .filter(s => (s.type === 'image' || s.type === 'video') && s.src)
+      .map(s => mediaUrl(s, zone)));
+    if (preloaderConfig && preloaderConfig.src) media.push(preloaderConfig.src);
+    const assets = Array.from(document.querySelectorAll('script[src], link[rel="stylesheet"][href]'))
+      .map(el => el.src || el.href);
+    // The page itself and its manifest: the first visit loads them before the worker is in control
+    const shell = [window.location.href.split('#')[0]];
+    if (manifestUrl) shell.push(manifestUrl);
+    navigator.serviceWorker.ready.then(registration => {
+      registration.active.postMessage({
+        type: 'sync',
+        media: media,
+        assets: assets,
+        shell: shell,
+        quota_mb: offlineConfig.quota_mb,
+      });
+    });
+  }
+
+  // Switch exactly when the schedule says so: fetch what plays next a little
+  // ahead of time, then swap it in on the dot, interrupting the current slide
+  function scheduleTransition(at) {
+    clearTimeout(transitionTimer);
+    transitionTimer = null;
+    if (!manifestUrl || !at) return;
+    const fetchDelay = Math.max(0, at - Date.now() - TRANSITION_PREFETCH_MS);
+    transitionTimer = setTimeout(() => {
+      fetch(`${manifestUrl}?at=${at}`, { cache: 'no-store' })
+        .then(response => {
+          if (!response.ok) throw new Error(`HTTP ${response.status}`);
+          return response.json();
+        })
+        .then(manifest => {
+          transitionTimer = setTimeout(() => {
+            console.log('DS Player: Schedule transition to revision', manifest.revision);
+            pendingManifest = manifest;
+            next(primaryZone());
+          }, Math.max(0, at - Date.now()));
+        })
+        .catch(err => {
+          // Regular manifest checks pick the change up instead
+          console.log('DS Player: Failed to fetch the next schedule transition:', err);
+        });
+    }, fetchDelay);
+  }
+
+  // Ask the server whether the playlist changed; an unchanged playlist is a 304
+  function checkManifest() {
+    return fetch(manifestUrl, {
+      cache: 'no-store',
+      headers: revision ? { 'If-None-Match': `"${revision}"` } : {},
+    })
+      .then(response => {
+        if (response.status === 304) return null;
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+      })
+      .then(manifest => {
+        if (manifest && manifest.revision !== revision) {
+          console.log('DS Player: New playlist revision available:', manifest.revision);
+          pendingManifest = manifest;
+          const primary = primaryZone();
+          if (!primary.slides.length) next(primary); // Nothing playing, no boundary to wait for
+        }
+      })
+      .catch(err => {
+        console.log('DS Player: Manifest check failed:', err);
+      });
+  }
+
+  function pollManifest() {
+    // While pushed notifications arrive, polling is only a safety net
+    const interval = busConnected ? manifestPollInterval * BUS_POLL_FACTOR : manifestPollInterval;
+    checkManifest().finally(() => setTimeout(pollManifest, interval * 1000));
+  }
+
+  // Pushed updates: the server notifies the screen's bus channel when its
+  // playlist changes, so the player checks its manifest right away
+  const BUS_POLL_FACTOR = 10;
+  const BUS_MAX_RETRY_MS = 60 * 1000;
+  let busConnected = false;
+  let busLastId = 0;
+  let busRetryMs = 1000;
+
+  function connectBus() {
+    const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${scheme}://${window.location.host}/websocket?version=${encodeURIComponent(busConfig.version)}`);
+    socket.addEventListener('open', () => {
+      busConnected = true;
+      busRetryMs = 1000;
+      socket.send(JSON.stringify({
+        event_name: 'subscribe',
+        data: { channels: [busConfig.channel], last: busLastId },
+      }));
+    });
+    socket.addEventListener('message', event => {
+      let notifications;
+      try {
+        notifications = JSON.parse(event.data);
+      } catch (err) {
+        return;
+      }
+      let changed = false;
+      for (const notification of Array.isArray(notifications) ? notifications : []) {
+        busLastId = Math.max(busLastId, notification.id || 0);
+        if (notification.message && notification.message.type === 'ds_signage/revision') changed = true;
+      }
+      if (changed) {
+        console.log('DS Player: Update notification received');
+        checkManifest();
+      }
+    });
+    socket.addEventListener('close', () => {
+      busConnected = false;
+      // Reconnect with backoff; notifications missed meanwhile are replayed from busLastId
+      setTimeout(connectBus, busRetryMs);
+      busRetryMs = Math.min(busRetryMs * 2, BUS_MAX_RETRY_MS);
+    });
+  }
+
+  // Rough memory cost of slide elements, used to bound the slide cache
+  const ESTIMATED_BYTES = {
+    image: 8 * 1024 * 1024, // Until the decoded size is known
+    video: 64 * 1024 * 1024, // Decoder and media buffers
+    iframe: 32 * 1024 * 1024, // A whole document
+    qweb: 1024 * 1024,
+  };
+
+  // Drop what an element holds on to: media buffers, documents, decoded images
+  function releaseElement(el) {
+    if (el.parentNode) el.parentNode.removeChild(el);
+    if (el.tagName === 'VIDEO') {
+      el.pause();
+      el.removeAttribute('src');
+      Array.from(el.querySelectorAll('source')).forEach(source => source.remove());
+      el.load(); // Resets the media element and frees its buffers
+    } else if (el.tagName === 'IFRAME') {
+      el.src = 'about:blank';
+    } else if (el.tagName === 'IMG') {
+      el.removeAttribute('src');
+    }
+  }
+
+  // LRU of rendered slides (a Map iterates in insertion order: oldest first)
+  function createSlideCache(maxItems, maxBytes) {
+    const entries = new Map(); // key -> { el, bytes }
+    let totalBytes = 0;
+    let hits = 0;
+    let misses = 0;
+    let evictions = 0;
+
+    function remove(key) {
+      const entry = entries.get(key);
+      entries.delete(key);
+      totalBytes -= entry.bytes;
+      releaseElement(entry.el);
+    }
+
+    // Evict least recently used slides, never the one just stored (it is on screen)
+    function shrink(keep) {
+      for (const key of entries.keys()) {
+        if (entries.size <= maxItems && totalBytes <= maxBytes) break;
+        if (key === keep) continue;
+        remove(key);
+        evictions++;
+        console.log('DS Player: Evicted cached slide', key);
+      }
+    }
+
+    return {
+      has(key) {
+        return entries.has(key);
+      },
+      get(key) {
+        const entry = entries.get(key);
+        if (!entry) {
+          misses++;
+          return null;
+        }
+        hits++;
+        // Mark as most recently used
+        entries.delete(key);
+        entries.set(key, entry);
+        return entry.el;
+      },
+      set(key, el, bytes) {
+        if (entries.has(key)) remove(key);
+        entries.set(key, { el: el, bytes: bytes });
+        totalBytes += bytes;
+        shrink(key);
+        console.log('DS Player: Slide cache', this.stats());
+      },
+      // Correct the estimate once the real size is known (e.g. decoded image)
+      resize(key, el, bytes) {
+        const entry = entries.get(key);
+        if (!entry || entry.el !== el) return;
+        totalBytes += bytes - entry.bytes;
+        entry.bytes = bytes;
+        shrink(key);
+      },
+      clear() {
+        Array.from(entries.keys()).forEach(remove);
+      },
+      stats() {
+        return {
+          items: entries.size,
+          max_items: maxItems,
+          bytes: totalBytes,
+          max_bytes: maxBytes,
+          hits: hits,
+          misses: misses,
+          evictions: evictions,
+        };
+      },
+    };
+  }
+
+  // Warm up the next slides while the current one shows
+  function preloadAhead(zone) {
+    if (!preloadNextSlide) return;
+    const zoneSlides = zone.slides;
+    for (let i = 1; i <= Math.min(preloadDepth, zoneSlides.length - 1); i++) {
+      startPreloadNextSlide(zone, zoneSlides[(zone.idx + i) % zoneSlides.length]);
+    }
+  }
+
+  // Last calendar answer per URL, revalidated with its ETag
+  const calendarData = {};
+
+  function fetchCalendar(src) {
+    const known = calendarData[src];
+    return fetch(src, {
+      cache: 'no-store',
+      headers: known && known.etag ? { 'If-None-Match': known.etag } : {},
+    })
+      .then(response => {
+        if (response.status === 304 && known) return known.data;
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json().then(data => {
+          calendarData[src] = { etag: response.headers.get('ETag'), data };
+          return data;
+        });
+      })
+      .catch(err => {
+        // Offline or server error: keep showing the last known events
+        if (known) return known.data;
+        throw err;
+      });
+  }
+
+  function renderCalendar(wrap, data) {
+    const list = mk('div', { className: 'ds-calendar-events' });
+    const events = (data && data.events) || [];
+    for (const event of events) {
+      const details = mk('div', { className: 'ds-event-details' });
+      details.appendChild(mk('h4', { innerText: event.name || '' }));
+      if (event.location) details.appendChild(mk('p', { innerText: event.location }));
+      const time = mk('div', { className: 'ds-event-time' });
+      time.appendChild(mk('span', { innerText: event.time || '' }));
+      const row = mk('div', { className: 'ds-calendar-event' });
+      row.appendChild(time);
+      row.appendChild(details);
+      list.appendChild(row);
+    }
+    if (!events.length) {
+      list.appendChild(mk('div', { className: 'ds-no-events', innerText: 'No events scheduled for today' }));
+    }
+    wrap.replaceChildren(mk('h2', { className: 'ds-calendar-title', innerText: 'Upcoming Events' }), list);
   }
 
   function mk(tag, attrs) {
@@ -116,16 +841,17 @@ document.addEventListener('DOMContentLoaded', function() {
     }
   }
 
-  function showPreloader() {
+  function showPreloader(zone) {
     if (!preloadedPreloaderElement) {
       console.log('DS Player: No preloader configured');
       return;
     }
     
     console.log('DS Player: Showing preloader');
-    hidePreloader(); // Remove any existing preloader first
+    hidePreloader(zone); // Remove any existing preloader first
     
-    preloaderOverlay = mk('div', { className: 'ds-preloader-overlay' });
+    const preloaderOverlay = mk('div', { className: 'ds-preloader-overlay' });
+    zone.preloaderOverlay = preloaderOverlay;
     
     // Clone the preloaded element to reuse it
     const preloaderClone = preloadedPreloaderElement.cloneNode(true);
@@ -142,92 +868,96 @@ document.addEventListener('DOMContentLoaded', function() {
     
     preloaderOverlay.appendChild(preloaderClone);
     // Add preloader as first child so it's on top (with z-index)
-    container.insertBefore(preloaderOverlay, container.firstChild);
+    zone.el.insertBefore(preloaderOverlay, zone.el.firstChild);
   }
 
-  function hidePreloader() {
+  function hidePreloader(zone) {
+    const preloaderOverlay = zone.preloaderOverlay;
     if (preloaderOverlay && preloaderOverlay.parentNode) {
       console.log('DS Player: Hiding preloader');
       preloaderOverlay.parentNode.removeChild(preloaderOverlay);
-      preloaderOverlay = null;
     }
+    zone.preloaderOverlay = null;
   }
 
-  function render(slide) {
+  function render(zone, slide) {
     console.log('DS Player: Rendering slide:', slide);
     const type = slide.type;
     const dur = Math.max(1, parseInt(slide.duration || 10, 10)) * 1000;
     const shouldCache = cacheSlides && slide.cache_content !== false;
-    const cacheKey = `slide_${slide.id}`;
+    const cacheKey = `${zone.id}:slide_${slide.id}`;
     
     // Check if we have a cached version of this slide
-    if (shouldCache && slideCache[cacheKey]) {
+    const cached = shouldCache ? slideCache.get(cacheKey) : null;
+    if (cached) {
       console.log('DS Player: Using cached slide:', slide.name);
       
       // For cached videos, restart playback properly
       if (type === 'video' || type === 'video_url') {
         // Show preloader for cached videos too
-        showPreloader();
+        showPreloader(zone);
         
-        clear();
-        const video = slideCache[cacheKey];
-        container.appendChild(video);
+        clear(zone);
+        const video = cached;
+        zone.el.appendChild(video);
         
-        // Reset video to beginning
+        // Rewind: the media stays buffered, no need to load() it again
         video.currentTime = 0;
-        video.load(); // Reload the video source to reset state
+        watchVideo(zone, slide, video);
         
         // Re-attach playing event listener to hide preloader
         video.addEventListener('playing', () => {
           console.log('DS Player: Cached video is now playing');
-          hidePreloader();
+          hidePreloader(zone);
         }, { once: true });
         
         // Re-attach ended event listener
-        video.addEventListener('ended', next, { once: true });
+        video.addEventListener('ended', () => videoEnded(zone), { once: true });
         
         // Start playback
         video.play().catch(err => {
           console.log('DS Player: Cached video play failed:', err);
-          hidePreloader();
+          recordError(slide, `Video play failed: ${err}`);
+          hidePreloader(zone);
         });
         
-        wait(dur + 2000);
+        wait(zone, dur + 2000);
       } else {
         // For non-video cached slides (images, iframes, qweb)
-        clear();
-        container.appendChild(slideCache[cacheKey]);
-        wait(dur);
+        clear(zone);
+        zone.el.appendChild(cached);
+        markFirstFrame(zone, slide);
+        wait(zone, dur);
       }
       
-      // Preload next slide if enabled
-      if (preloadNextSlide) {
-        const nextIdx = (idx + 1) % slides.length;
-        startPreloadNextSlide(slides[nextIdx]);
-      }
+      preloadAhead(zone);
       return;
     }
     
     // Show preloader on top BEFORE clearing and loading the new slide
     // This ensures no gap or browser loading indicators show
-    const needsPreloader = (type === 'video' || type === 'video_url' || type === 'youtube' || type === 'webpage' || type === 'calendar');
+    const needsPreloader = (type === 'video' || type === 'video_url' || type === 'youtube' || type === 'webpage' || (type === 'calendar' && !slide.json_src));
     if (needsPreloader) {
-      showPreloader();
+      showPreloader(zone);
     }
     
     // Now clear and load the slide underneath the preloader
-    clear();
+    clear(zone);
 
     if (type === 'image') {
       console.log('DS Player: Creating image element with src:', slide.src);
-      const img = mk('img', { src: slide.src, className: 'ds-fit' });
+      const img = mk('img', { src: mediaUrl(slide, zone), className: 'ds-fit' });
       
       img.addEventListener('load', () => {
         console.log('DS Player: Image loaded successfully:', slide.src);
+        markFirstFrame(zone, slide);
+        // Decoded bitmap: 4 bytes per pixel
+        slideCache.resize(cacheKey, img, img.naturalWidth * img.naturalHeight * 4);
       });
       
       img.addEventListener('error', (e) => {
         console.error('DS Player: Image failed to load:', slide.src, e);
+        recordError(slide, 'Image failed to load');
         console.log('DS Player: Testing image URL access...');
         
         // Test if URL is accessible
@@ -246,24 +976,20 @@ document.addEventListener('DOMContentLoaded', function() {
           className: 'ds-error', 
           innerText: `Image Error: Failed to load ${slide.name}. URL: ${slide.src}`
         });
-        container.appendChild(errorMsg);
+        zone.el.appendChild(errorMsg);
       });
       
-      container.appendChild(img);
+      zone.el.appendChild(img);
       
       // Cache the image element if caching is enabled
       if (shouldCache) {
-        slideCache[cacheKey] = img;
+        slideCache.set(cacheKey, img, ESTIMATED_BYTES.image);
         console.log('DS Player: Cached image slide:', slide.name);
       }
       
-      wait(dur);
+      wait(zone, dur);
       
-      // Preload next slide if enabled
-      if (preloadNextSlide) {
-        const nextIdx = (idx + 1) % slides.length;
-        startPreloadNextSlide(slides[nextIdx]);
-      }
+      preloadAhead(zone);
       return;
     }
 
@@ -278,13 +1004,11 @@ document.addEventListener('DOMContentLoaded', function() {
         className: 'ds-contain',
         controls: false
       });
-      // Provide explicit MIME hint via <source> to help Safari determine codec/container
-      const lname = String(slide.name || '').toLowerCase();
-      let guessedType = '';
-      if (lname.endsWith('.mp4') || lname.endsWith('.m4v')) guessedType = 'video/mp4';
-      else if (lname.endsWith('.mov')) guessedType = 'video/quicktime';
-      else if (lname.endsWith('.webm')) guessedType = 'video/webm';
-      const sourceEl = mk('source', guessedType ? { src: slide.src, type: guessedType } : { src: slide.src });
+      // MIME hint via <source> (helps Safari pick the container): the type the server serves,
+      // e.g. video/mp4 once a rendition exists. Left out when the browser would refuse it
+      // outright (video/quicktime on Chromium), so that it sniffs the file instead
+      const sourceType = slide.mimetype && video.canPlayType(slide.mimetype) ? slide.mimetype : '';
+      const sourceEl = mk('source', sourceType ? { src: slide.src, type: sourceType } : { src: slide.src });
       video.appendChild(sourceEl);
       
       video.addEventListener('loadstart', () => {
@@ -299,6 +1023,7 @@ document.addEventListener('DOMContentLoaded', function() {
         console.log('DS Player: Video data loaded, attempting play');
         video.play().catch(err => {
           console.log('DS Player: Video autoplay failed:', err);
+          recordError(slide, `Video autoplay failed: ${err}`);
           // Show click hint for user interaction
           const hint = mk('div', { 
             className: 'ds-hint', 
@@ -320,11 +1045,11 @@ document.addEventListener('DOMContentLoaded', function() {
       // Hide preloader when video actually starts playing
       video.addEventListener('playing', () => {
         console.log('DS Player: Video is now playing');
-        hidePreloader();
+        hidePreloader(zone);
       }, { once: true });
       
       video.addEventListener('error', (e) => {
-        hidePreloader(); // Hide preloader on error too
+        hidePreloader(zone); // Hide preloader on error too
         const errorCodes = {
           1: 'MEDIA_ERR_ABORTED - Video loading aborted',
           2: 'MEDIA_ERR_NETWORK - Network error loading video', 
@@ -335,6 +1060,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const errorText = errorCodes[errorCode] || `Unknown error (${errorCode})`;
         
         console.error('DS Player: Video error:', errorText, 'URL:', slide.src);
+        recordError(slide, errorText);
         console.log('DS Player: Testing direct URL access...');
         
         // Test if URL is accessible
@@ -353,27 +1079,43 @@ document.addEventListener('DOMContentLoaded', function() {
           className: 'ds-error', 
           innerText: `Video Error: ${errorText}. URL: ${slide.src}`
         });
-        container.appendChild(errorMsg);
-        wait(5000); // Give more time to read error
+        zone.el.appendChild(errorMsg);
+        wait(zone, 5000); // Give more time to read error
       });
       
-      video.addEventListener('ended', next, { once: true });
+      video.addEventListener('ended', () => videoEnded(zone), { once: true });
+      watchVideo(zone, slide, video);
       
       // Fallback timer in case video doesn't end naturally
-      wait(dur + 2000);
-      container.appendChild(video);
+      wait(zone, dur + 2000);
+      zone.el.appendChild(video);
       
       // Cache the video element if caching is enabled
       if (shouldCache) {
-        slideCache[cacheKey] = video;
+        slideCache.set(cacheKey, video, ESTIMATED_BYTES.video);
         console.log('DS Player: Cached video slide:', slide.name);
       }
       
-      // Preload next slide if enabled
-      if (preloadNextSlide) {
-        const nextIdx = (idx + 1) % slides.length;
-        startPreloadNextSlide(slides[nextIdx]);
-      }
+      preloadAhead(zone);
+      return;
+    }
+
+    if (type === 'calendar' && slide.json_src) {
+      // Rendered here from JSON: refreshed on every showing with a conditional request
+      const wrap = mk('div', { className: 'ds-calendar-container' });
+      zone.el.appendChild(wrap);
+      fetchCalendar(slide.json_src)
+        .then(data => {
+          renderCalendar(wrap, data);
+          markFirstFrame(zone, slide);
+        })
+        .catch(err => {
+          console.error('DS Player: Calendar fetch failed:', err);
+          recordError(slide, `Calendar fetch failed: ${err}`);
+          wrap.appendChild(mk('div', { className: 'ds-error', innerText: 'Calendar unavailable' }));
+        });
+      wait(zone, dur);
+      preloadAhead(zone);
       return;
     }
 
@@ -398,72 +1140,68 @@ document.addEventListener('DOMContentLoaded', function() {
       // Hide preloader when iframe loads
       iframe.addEventListener('load', () => {
         console.log('DS Player: Iframe loaded');
+        markFirstFrame(zone, slide);
         // Delay hiding preloader for YouTube/webpages to ensure content is visible
         setTimeout(() => {
-          hidePreloader();
+          hidePreloader(zone);
         }, type === 'youtube' ? 2000 : 500);
       });
       
       // Fallback: hide preloader after a timeout if load event doesn't fire
       setTimeout(() => {
         console.log('DS Player: Fallback timeout - hiding preloader');
-        hidePreloader();
+        hidePreloader(zone);
       }, 8000);
       
-      container.appendChild(iframe);
+      zone.el.appendChild(iframe);
       
       // Cache the iframe if caching is enabled AND this slide allows caching
       if (shouldCache && slide.cache_content !== false) {
-        slideCache[cacheKey] = iframe;
+        slideCache.set(cacheKey, iframe, ESTIMATED_BYTES.iframe);
         console.log('DS Player: Cached iframe slide:', slide.name);
       }
       
-      wait(dur);
+      wait(zone, dur);
       
-      // Preload next slide if enabled
-      if (preloadNextSlide) {
-        const nextIdx = (idx + 1) % slides.length;
-        startPreloadNextSlide(slides[nextIdx]);
-      }
+      preloadAhead(zone);
       return;
     }
 
     if (type === 'qweb') {
       const wrap = mk('div', { className: 'ds-qweb' });
-      wrap.innerHTML = slide.html || '';
-      container.appendChild(wrap);
+      fetchSlideHtml(slide).then(html => {
+        wrap.innerHTML = html;
+        markFirstFrame(zone, slide);
+      });
+      zone.el.appendChild(wrap);
       
       // Cache QWeb if caching is enabled
       if (shouldCache) {
-        slideCache[cacheKey] = wrap;
+        slideCache.set(cacheKey, wrap, ESTIMATED_BYTES.qweb);
         console.log('DS Player: Cached QWeb slide:', slide.name);
       }
       
-      wait(dur);
+      wait(zone, dur);
       
-      // Preload next slide if enabled
-      if (preloadNextSlide) {
-        const nextIdx = (idx + 1) % slides.length;
-        startPreloadNextSlide(slides[nextIdx]);
-      }
+      preloadAhead(zone);
       return;
     }
 
     // Unknown type
     const err = mk('div', { className: 'ds-error', innerText: 'Unsupported slide type: ' + String(type) });
-    container.appendChild(err);
-    wait(3000);
+    zone.el.appendChild(err);
+    wait(zone, 3000);
   }
 
   // Preload the next slide in background
-  function startPreloadNextSlide(nextSlide) {
+  function startPreloadNextSlide(zone, nextSlide) {
     if (!nextSlide) return;
     
-    const cacheKey = `slide_${nextSlide.id}`;
+    const cacheKey = `${zone.id}:slide_${nextSlide.id}`;
     const shouldCache = cacheSlides && nextSlide.cache_content !== false;
     
-    // If already cached, no need to preload
-    if (shouldCache && slideCache[cacheKey]) {
+    // If already cached or on its way, no need to preload
+    if ((shouldCache && slideCache.has(cacheKey)) || preloading[nextSlide.id]) {
       console.log('DS Player: Next slide already cached, skip preload');
       return;
     }
@@ -473,7 +1211,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Preload based on type
     if (nextSlide.type === 'image') {
       const img = new Image();
-      img.src = nextSlide.src;
+      preloading[nextSlide.id] = true;
+      img.onload = img.onerror = () => delete preloading[nextSlide.id];
+      img.src = mediaUrl(nextSlide, zone);
       // Browser will cache it automatically
     } else if (nextSlide.type === 'video' || nextSlide.type === 'video_url') {
       // Create hidden video element to trigger buffering
@@ -486,9 +1226,11 @@ document.addEventListener('DOMContentLoaded', function() {
       video.appendChild(sourceEl);
       video.load();
       document.body.appendChild(video);
-      // Clean up after 5 seconds
+      preloading[nextSlide.id] = true;
+      // Clean up after 5 seconds, freeing the buffers explicitly
       setTimeout(() => {
-        if (video.parentNode) video.parentNode.removeChild(video);
+        releaseElement(video);
+        delete preloading[nextSlide.id];
       }, 5000);
     }
     // YouTube and iframes benefit less from preloading, skip them
@@ -557,15 +1299,85 @@ document.addEventListener('DOMContentLoaded', function() {
     }, 2000);
   }
 
+  // Expose cache occupancy for diagnostics (e.g. from the remote devtools of a screen)
+  window.dsPlayer = {
+    cacheStats: () => slideCache.stats(),
+  };
+
   // Preload the preloader asset if configured
   preloadPreloaderAsset();
+  registerServiceWorker();
 
-  if (slides.length) {
-    console.log('DS Player: Starting slideshow with', slides.length, 'slides');
-    next();
+  const layout = Array.isArray(meta.layout) && meta.layout.length ? meta.layout : null;
+  if (layout) {
+    for (const region of layout) {
+      const [x, y, w, h] = region.rect;
+      const el = mk('div', { className: 'ds-zone' });
+      Object.assign(el.style, { left: `${x}%`, top: `${y}%`, width: `${w}%`, height: `${h}%` });
+      container.appendChild(el);
+      const zone = createZone(String(region.id), el, [], !!region.main);
+      zone.slides = zoneSlidesFrom(initialSlides, initialZoneSlides, zone);
+      zones.push(zone);
+    }
   } else {
-    console.log('DS Player: No slides to display');
-    const msg = mk('div', { className: 'ds-error', innerText: 'No slides in playlist' });
-    container.appendChild(msg);
+    zones.push(createZone('main', container, initialSlides, true));
+  }
+
+  function startZones() {
+    for (const zone of zones) {
+      if (zone.slides.length) {
+        console.log('DS Player: Starting zone', zone.id, 'with', zone.slides.length, 'slides');
+        next(zone);
+      } else if (!layout) {
+        console.log('DS Player: No slides to display');
+        const msg = mk('div', { className: 'ds-error', innerText: 'No slides in playlist' });
+        zone.el.appendChild(msg);
+      }
+    }
+    requestAnimationFrame(tick);
+    // Animation frames stop in background pages: keep the timelines going, coarsely
+    setInterval(() => {
+      if (document.hidden) advanceZones();
+    }, 1000);
+  }
+
+  if (syncConfig) {
+    // Join the group's timeline once the clock is known, then keep it disciplined
+    syncClock().finally(startZones);
+    setInterval(syncClock, TIME_SYNC_INTERVAL_MS);
+  } else {
+    startZones();
+  }
+
+  if (telemetryUrl) {
+    setInterval(flushTelemetry, telemetryInterval * 1000);
+    window.addEventListener('pagehide', () => {
+      zones.forEach(finishShowing);
+      flushTelemetry();
+    });
+  }
+
+  if (eventsUrl) {
+    setInterval(flushEvents, eventsFlushInterval * 1000);
+    // Last chance to upload before the page goes away
+    window.addEventListener('pagehide', () => {
+      zones.forEach(finishPlay);
+      flushEvents();
+    });
+  }
+
+  if (pingUrl && pingInterval > 0) {
+    ping();
+    setInterval(ping, pingInterval * 1000);
   }
+
+  if (manifestUrl && manifestPollInterval > 0) {
+    setTimeout(pollManifest, manifestPollInterval * 1000);
+  }
+
+  if (manifestUrl && busConfig && 'WebSocket' in window) {
+    connectBus();
+  }
+
+  scheduleTransition(meta.next_transition);
 });
@@ -0,0 +1,179 @@
+/* Digital Signage offline service worker, served as /ds/sw.js (scope /ds/).
+ *
+ * - Media (/ds/c/<sha1>, /ds/a/<id>/content?v=...) is content-addressed or
+ *   content-versioned: served cache-first,
+ *   Range requests included, and precached from the list the player sends.
+ * - The player shell (page, manifest, QWeb fragments, asset bundle) is
+ *   network-first with the last good copy as offline fallback; the page,
+ *   manifest and bundle are also precached from the list the player sends.
+ */
+'use strict';
+
+const MEDIA_CACHE = 'ds-media-v1';
+const SHELL_CACHE = 'ds-shell-v1';
+const DEFAULT_QUOTA_MB = 500;
+
+self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', event => event.waitUntil(self.clients.claim()));
+
+function isMedia(url) {
+  return (/^\/ds\/a\/\d+\/content$/.test(url.pathname) && url.searchParams.has('v'))
+    || /^\/ds\/c\/[0-9a-f]{40}$/.test(url.pathname);
+}
+
+function isShell(request, url) {
+  return request.mode === 'navigate'
+    // Manifests of upcoming schedule transitions (``at``) are one-off: not kept
+    || (url.pathname.startsWith('/ds/s/') && !url.searchParams.has('at'))
+    || /^\/ds\/a\/\d+\/html$/.test(url.pathname)
+    || url.pathname.startsWith('/web/assets/');
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+  if (isMedia(url)) {
+    event.respondWith(mediaResponse(request));
+  } else if (isShell(request, url)) {
+    event.respondWith(shellResponse(request));
+  }
+});
+
+async function mediaResponse(request) {
+  const cache = await caches.open(MEDIA_CACHE);
+  const cached = await cache.match(request.url);
+  if (cached) {
+    const range = request.headers.get('Range');
+    return range ? rangeResponse(cached, range) : cached;
+  }
+  // Not precached (yet): go to the network, Range requests included
+  return fetch(request);
+}
+
+// Answer a Range request from a fully cached response
+async function rangeResponse(cached, range) {
+  const blob = await cached.blob();
+  const match = /^bytes=(\d*)-(\d*)$/.exec(range.trim());
+  if (!match || (!match[1] && !match[2])) {
+    return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${blob.size}` } });
+  }
+  let start;
+  let end;
+  if (match[1] === '') {
+    // Suffix length: 'bytes=-N' means the last N bytes
+    start = Math.max(blob.size - parseInt(match[2], 10), 0);
+    end = blob.size - 1;
+  } else {
+    start = parseInt(match[1], 10);
+    end = match[2] ? Math.min(parseInt(match[2], 10), blob.size - 1) : blob.size - 1;
+  }
+  if (start >= blob.size || end < start) {
+    return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${blob.size}` } });
+  }
+  return new Response(blob.slice(start, end + 1), {
+    status: 206,
+    headers: {
+      'Content-Type': cached.headers.get('Content-Type') || 'application/octet-stream',
+      'Content-Range': `bytes ${start}-${end}/${blob.size}`,
+      'Content-Length': String(end - start + 1),
+      'Accept-Ranges': 'bytes',
+    },
+  });
+}
+
+async function shellResponse(request) {
+  const cache = await caches.open(SHELL_CACHE);
+  try {
+    const response = await fetch(request);
+    if (response.ok) {
+      cache.put(request.url, response.clone());
+    }
+    return response;
+  } catch (err) {
+    // Offline: fall back to the last good copy, ignoring conditional headers
+    const cached = await cache.match(request.url);
+    if (cached) return cached;
+    throw err;
+  }
+}
+
+function responseSize(response) {
+  return parseInt(response.headers.get('Content-Length') || '0', 10);
+}
+
+// Precache the media of the current playlist, evict what left it, stay under the quota
+async function syncMedia(urls, quotaMb) {
+  const quota = (quotaMb || DEFAULT_QUOTA_MB) * 1024 * 1024;
+  const wanted = new Set(urls.map(u => new URL(u, self.location.origin).href));
+  const cache = await caches.open(MEDIA_CACHE);
+
+  let used = 0;
+  for (const request of await cache.keys()) {
+    if (!wanted.has(request.url)) {
+      await cache.delete(request);
+      continue;
+    }
+    used += responseSize(await cache.match(request));
+    wanted.delete(request.url);
+  }
+
+  for (const url of wanted) {
+    try {
+      // Image renditions (``w``) are negotiated: ask for WebP like the <img> that shows them
+      const headers = new URL(url).searchParams.has('w') ? { Accept: 'image/webp,image/*' } : {};
+      const response = await fetch(url, { headers: headers });
+      // Partial or opaque responses cannot be replayed for arbitrary ranges
+      if (response.status !== 200) continue;
+      const size = responseSize(response);
+      if (used + size > quota) {
+        console.log('DS Service Worker: Offline quota reached, not caching', url);
+        continue;
+      }
+      await cache.put(url, response);
+      used += size;
+    } catch (err) {
+      console.log('DS Service Worker: Precache failed for', url, err);
+    }
+  }
+  console.log('DS Service Worker: Media cache holds', Math.round(used / 1024 / 1024), 'MB');
+}
+
+// Cache the shell the page loaded before the service worker controlled it
+// (first visit), so that a reload during the first outage still plays
+async function precacheShell(urls) {
+  const cache = await caches.open(SHELL_CACHE);
+  for (const url of urls) {
+    const href = new URL(url, self.location.origin).href;
+    if (await cache.match(href)) continue;
+    try {
+      const response = await fetch(href, { credentials: 'same-origin' });
+      if (response.ok) await cache.put(href, response);
+    } catch (err) {
+      console.log('DS Service Worker: Precache failed for', href, err);
+    }
+  }
+}
+
+// Drop bundles of previous deployments: only the ones the page uses now are kept
+async function pruneShell(assetUrls) {
+  const keep = new Set(assetUrls.map(u => new URL(u, self.location.origin).href));
+  const cache = await caches.open(SHELL_CACHE);
+  for (const request of await cache.keys()) {
+    if (new URL(request.url).pathname.startsWith('/web/assets/') && !keep.has(request.url)) {
+      await cache.delete(request);
+    }
+  }
+}
+
+self.addEventListener('message', event => {
+  const data = event.data || {};
+  if (data.type === 'sync') {
+    event.waitUntil(Promise.all([
+      syncMedia(data.media || [], data.quota_mb),
+      precacheShell((data.shell || []).concat(data.assets || []))
+        .then(() => pruneShell(data.assets || [])),
+    ]));
+  }
+});
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the player routes and of asset delivery.
+
+Not part of the regular test runs (tagged ``-standard``); run them with::
+
+    odoo-bin -d <db> -i ds_signage --test-tags ds_benchmark --stop-after-init
+
+Results are written as JSON to ``$DS_BENCHMARK_OUTPUT`` (default:
+``ds_signage_benchmark.json`` in the temporary directory), one entry per
+route, playlist size and cache state, so that runs can be compared.
+"""
+import base64
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from odoo import release
+from odoo.tests import HttpCase, tagged
+
+from odoo.addons.ds_signage.models.payload_cache import calendar_cache, payload_cache, render_cache, schedule_cache
+
+_logger = logging.getLogger(__name__)
+
+# Number of items of the benchmarked playlists
+BENCHMARK_SIZES = (10, 100, 1000)
+# Timed requests per benchmark, after one warm-up request
+BENCHMARK_ROUNDS = 20
+# Size of the uploaded video served by the content benchmarks, in bytes
+BENCHMARK_ASSET_SIZE = 32 * 1024 * 1024
+# Bytes asked for by the Range requests
+BENCHMARK_RANGE_SIZE = 1024 * 1024
+
+# 1x1 transparent PNG
+_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+def _clear_caches():
+    for cache in (payload_cache, render_cache, schedule_cache, calendar_cache):
+        cache.clear()
+
+
+@tagged('post_install', '-at_install', '-standard', 'ds_benchmark')
+class TestPlayerBenchmark(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+        Asset = cls.env['ds.asset']
+        pool = Asset.create([
+            {'name': f"Image {i}", 'type': 'image', 'file': base64.b64encode(_PNG + bytes([i])), 'file_name': f"image_{i}.png"}
+            for i in range(5)
+        ] + [
+            {'name': "Web Page", 'type': 'webpage', 'url': 'https://example.com'},
+            {'name': "YouTube", 'type': 'youtube', 'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'},
+            {'name': "Calendar", 'type': 'calendar', 'url': '/ds/calendar'},
+        ])
+        cls.video = Asset.create({
+            'name': "Large Video",
+            'type': 'video',
+            'file': base64.b64encode(b'\x00\x00\x00\x18ftypmp42' + os.urandom(BENCHMARK_ASSET_SIZE - 12)),
+            'file_name': 'large.mp4',
+        })
+        cls.playlists = {}
+        cls.screens = {}
+        for size in BENCHMARK_SIZES:
+            playlist = cls.env['ds.playlist'].create({'name': f"Benchmark {size}"})
+            cls.env['ds.playlist.item'].create([
+                {'playlist_id': playlist.id, 'asset_id': pool[i % len(pool)].id, 'sequence': i}
+                for i in range(size)
+            ])
+            cls.playlists[size] = playlist
+            cls.screens[size] = cls.env['ds.screen'].create({'name': f"Benchmark {size}", 'playlist_id': playlist.id})
+        now = datetime.now()
+        cls.env['calendar.event'].create([{
+            'name': f"Meeting {i}",
+            'start': now.replace(hour=8, minute=0, second=0) + timedelta(hours=i),
+            'stop': now.replace(hour=8, minute=30, second=0) + timedelta(hours=i),
+        } for i in range(10)])
+        cls.env.flush_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        path = os.environ.get('DS_BENCHMARK_OUTPUT') or os.path.join(tempfile.gettempdir(), 'ds_signage_benchmark.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'odoo_version': release.version,
+                'python_version': platform.python_version(),
+                'rounds': BENCHMARK_ROUNDS,
+                'results': cls.results,
+            }, f, indent=2)
+        _logger.info("Digital signage benchmark results written to %s", path)
+        super().tearDownClass()
+
+    def _request(self, url, headers):
+        queries = self.cr.sql_log_count
+        start = time.perf_counter()
+        response = self.url_open(url, headers=headers, allow_redirects=False)
+        elapsed = (time.perf_counter() - start) * 1000
+        return response, elapsed, self.cr.sql_log_count - queries
+
+    def _benchmark(self, name, url, headers=None, items=None, cold=False, status=200):
+        """Time ``url`` over :data:`BENCHMARK_ROUNDS` requests and record the result.
+
+        With ``cold``, the worker caches are emptied before each request. The
+        query count is the one of the last request; the peak memory is taken
+        in a separate request with tracemalloc on (which slows it down), and
+        covers the Python allocations of the server and of the test client.
+        """
+        headers = headers or {}
+        if cold:
+            _clear_caches()
+        response, _elapsed, _queries = self._request(url, headers)
+        self.assertEqual(response.status_code, status, f"{name}: unexpected status for {url}")
+
+        latencies = []
+        for _round in range(BENCHMARK_ROUNDS):
+            if cold:
+                _clear_caches()
+            response, elapsed, queries = self._request(url, headers)
+            latencies.append(elapsed)
+
+        if cold:
+            _clear_caches()
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            self._request(url, headers)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+
+        latencies.sort()
+        self.results.append({
+            'name': name,
+            'url': url,
+            'items': items,
+            'cache': 'cold' if cold else 'warm',
+            'status': response.status_code,
+            'response_bytes': len(response.content),
+            'latency_ms': {
+                'min': round(latencies[0], 3),
+                'median': round(statistics.median(latencies), 3),
+                'p95': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+                'max': round(latencies[-1], 3),
+            },
+            'queries': queries,
+            'peak_memory_kb': round(peak / 1024, 1),
+        })
+
+    def test_screen_player(self):
+        for size, screen in self.screens.items():
+            for cold in (True, False):
+                self._benchmark('screen_player', f"/ds/s/{screen.token}", items=size, cold=cold)
+
+    def test_playlist_player(self):
+        for size, playlist in self.playlists.items():
+            for cold in (True, False):
+                self._benchmark('playlist_player', f"/ds/p/{playlist.id}", items=size, cold=cold)
+
+    def test_asset_content(self):
+        url = f"/ds/a/{self.video.id}/content"
+        self._benchmark('asset_content', url)
+        self._benchmark('asset_content_range', url, headers={'Range': f"bytes=0-{BENCHMARK_RANGE_SIZE - 1}"}, status=206)
+        self._benchmark('asset_content_range_tail', url, headers={
+            'Range': f"bytes={BENCHMARK_ASSET_SIZE - BENCHMARK_RANGE_SIZE}-{BENCHMARK_ASSET_SIZE - 1}",
+        }, status=206)
+
+    def test_calendar(self):
+        for cold in (True, False):
+            self._benchmark('calendar', "/ds/calendar", cold=cold)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""The player routes build their slides with a fixed number of queries, whatever the length of the playlist."""
+import base64
+
+from odoo.tests import HttpCase, tagged
+
+from odoo.addons.ds_signage.models.payload_cache import calendar_cache, payload_cache, render_cache, schedule_cache
+
+# Items (each with its own image) of the playlist whose query count must match the small one's
+LARGE_PLAYLIST_SIZE = 500
+SMALL_PLAYLIST_SIZE = 10
+
+# 1x1 transparent PNG
+_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+@tagged('post_install', '-at_install')
+class TestPlayerQueries(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.small_playlist, cls.small_screen = cls._create_playlist(SMALL_PLAYLIST_SIZE, offset=0)
+        cls.large_playlist, cls.large_screen = cls._create_playlist(LARGE_PLAYLIST_SIZE, offset=SMALL_PLAYLIST_SIZE)
+        cls.env.flush_all()
+
+    @classmethod
+    def _create_playlist(cls, size, offset):
+        """A playlist of ``size`` distinct images (distinct files, so distinct content URLs) and its screen"""
+        assets = cls.env['ds.asset'].create([{
+            'name': f"Image {offset + i}",
+            'type': 'image',
+            'file': base64.b64encode(_PNG + (offset + i).to_bytes(4, 'big')),
+            'file_name': f"image_{offset + i}.png",
+        } for i in range(size)])
+        playlist = cls.env['ds.playlist'].create({'name': f"Playlist of {size}"})
+        cls.env['ds.playlist.item'].create([
+            {'playlist_id': playlist.id, 'asset_id': asset.id, 'sequence': i}
+            for i, asset in enumerate(assets)
+        ])
+        screen = cls.env['ds.screen'].create({'name': f"Screen of {size}", 'playlist_id': playlist.id})
+        return playlist, screen
+
+    def _reset(self):
+        """Empty the worker caches and the ORM cache, so that the next request builds its payload"""
+        for cache in (payload_cache, render_cache, schedule_cache, calendar_cache):
+            cache.clear()
+        self.env.invalidate_all()
+
+    def _get(self, url):
+        """Request ``url`` from scratch; return its query count"""
+        self._reset()
+        queries = self.cr.sql_log_count
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
+        return self.cr.sql_log_count - queries
+
+    def _assert_flat(self, small_url, large_url):
+        # The first request also loads what any request needs (templates, bundles): not counted
+        self._get(small_url)
+        expected = self._get(small_url)
+        self._reset()
+        with self.assertQueryCount(expected):
+            self.url_open(large_url)
+
+    def test_screen_player_queries(self):
+        self._assert_flat(f"/ds/s/{self.small_screen.token}", f"/ds/s/{self.large_screen.token}")
+
+    def test_playlist_player_queries(self):
+        self._assert_flat(f"/ds/p/{self.small_playlist.id}", f"/ds/p/{self.large_playlist.id}")
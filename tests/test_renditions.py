@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Renditions of an asset whose processing fails do not leak files in the filestore."""
+import base64
+import io
+import os
+
+from PIL import Image
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRenditions(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Random pixels: the renditions are new to the filestore, not shared with any other attachment
+        image = Image.frombytes('RGB', (64, 48), os.urandom(64 * 48 * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        cls.asset = cls.env['ds.asset'].create({
+            'name': "Image",
+            'type': 'image',
+            'file': base64.b64encode(buffer.getvalue()),
+            'file_name': 'image.png',
+        })
+
+    def test_rolled_back_renditions_are_collected(self):
+        Attachment = self.env['ir.attachment']
+        self.assertEqual(Attachment._storage(), 'file')
+        paths = []
+        # What the cron does for an asset that fails once some renditions are stored
+        with self.assertRaises(RuntimeError), self.env.cr.savepoint():
+            self.env['ds.asset.rendition']._generate_renditions(self.asset)
+            attachments = self.asset.rendition_ids.attachment_id
+            self.assertTrue(attachments)
+            paths = [Attachment._full_path(fname) for fname in attachments.mapped('store_fname')]
+            raise RuntimeError("processing failed")
+        self.env.invalidate_all()
+        self.assertTrue(paths)
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+
+        Attachment._gc_file_store_unsafe()
+        self.assertFalse([path for path in paths if os.path.exists(path)])
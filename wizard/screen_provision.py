@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import base64
+import csv
+import io
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+# Columns of the provisioning CSV; only ``name`` is required
+CSV_COLUMNS = ("name", "playlist", "preloader", "timezone", "note")
+
+
+class DsScreenProvision(models.TransientModel):
+    _name = "ds.screen.provision"
+    _description = "Digital Signage Screen Provisioning"
+
+    operation = fields.Selection([
+        ("import", "Create Screens from CSV"),
+        ("assign", "Assign Playlist / Preloader"),
+        ("tokens", "Regenerate Tokens"),
+    ], required=True, default=lambda self: "assign" if self.env.context.get("active_ids") else "import")
+    csv_file = fields.Binary(string="CSV File",
+                             help="One screen per line, with a header line: name, playlist, preloader, timezone, note. "
+                                  "Playlists and preloaders are given by name or database ID.")
+    csv_filename = fields.Char()
+    screen_ids = fields.Many2many("ds.screen", string="Screens",
+                                  default=lambda self: self.env.context.get("active_ids", []) if self.env.context.get("active_model") == "ds.screen" else [])
+    assign_playlist = fields.Boolean(string="Set Playlist", default=True)
+    playlist_id = fields.Many2one("ds.playlist", string="Playlist")
+    assign_preloader = fields.Boolean(string="Set Preloader")
+    preloader_asset_id = fields.Many2one("ds.asset", string="Preloader Asset", domain=[("type", "in", ["image", "video"])])
+    state = fields.Selection([("draft", "Draft"), ("done", "Done")], default="draft")
+    result_file = fields.Binary(string="Player URLs", readonly=True)
+    result_filename = fields.Char(readonly=True)
+
+    @api.model
+    def _resolve_names(self, model, values):
+        """Map names or database IDs to IDs of ``model`` with one query"""
+        values = {v for v in values if v}
+        ids = {int(v) for v in values if v.isdigit()}
+        names = values - {str(i) for i in ids}
+        records = self.env[model].search_read(['|', ('id', 'in', list(ids)), ('name', 'in', list(names))], ['name'])
+        mapping = {}
+        for rec in records:
+            mapping.setdefault(rec['name'], rec['id'])
+            mapping[str(rec['id'])] = rec['id']
+        return mapping
+
+    def _read_csv(self):
+        self.ensure_one()
+        if not self.csv_file:
+            raise UserError(_("Upload a CSV file first."))
+        text = base64.b64decode(self.csv_file).decode('utf-8-sig')
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        rows = list(csv.DictReader(io.StringIO(text), dialect=dialect))
+        if rows and 'name' not in rows[0]:
+            raise UserError(_("The CSV file needs a header line with at least a 'name' column (columns: %s).", ", ".join(CSV_COLUMNS)))
+        return [{k.strip(): (v or '').strip() for k, v in row.items() if k} for row in rows]
+
+    def _import_screens(self):
+        rows = self._read_csv()
+        playlists = self._resolve_names('ds.playlist', (row.get('playlist') for row in rows))
+        preloaders = self._resolve_names('ds.asset', (row.get('preloader') for row in rows))
+        vals_list, errors = [], []
+        for lineno, row in enumerate(rows, start=2):
+            if not row.get('name'):
+                errors.append(_("Line %s: missing name", lineno))
+                continue
+            vals = {'name': row['name'], 'note': row.get('note') or False}
+            if row.get('playlist'):
+                if row['playlist'] not in playlists:
+                    errors.append(_("Line %(line)s: unknown playlist '%(name)s'", line=lineno, name=row['playlist']))
+                vals['playlist_id'] = playlists.get(row['playlist'])
+            if row.get('preloader'):
+                if row['preloader'] not in preloaders:
+                    errors.append(_("Line %(line)s: unknown asset '%(name)s'", line=lineno, name=row['preloader']))
+                vals['preloader_asset_id'] = preloaders.get(row['preloader'])
+            if row.get('timezone'):
+                vals['tz'] = row['timezone']
+            vals_list.append(vals)
+        if errors:
+            raise UserError("\n".join(errors[:50]))
+        return self.env['ds.screen'].create(vals_list)
+
+    def action_apply(self):
+        self.ensure_one()
+        if self.operation == 'import':
+            screens = self._import_screens()
+        else:
+            screens = self.screen_ids
+            if not screens:
+                raise UserError(_("Select the screens to update."))
+            if self.operation == 'assign':
+                vals = {}
+                if self.assign_playlist:
+                    vals['playlist_id'] = self.playlist_id.id
+                if self.assign_preloader:
+                    vals['preloader_asset_id'] = self.preloader_asset_id.id
+                screens._bulk_assign(vals)
+            else:
+                screens._regenerate_tokens()
+
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=['id', 'name', 'token', 'url'])
+        writer.writeheader()
+        writer.writerows(screens._get_provisioning_data())
+        self.write({
+            'state': 'done',
+            'result_file': base64.b64encode(out.getvalue().encode()),
+            'result_filename': 'screens.csv',
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }